@@ -1,9 +1,14 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
+import json
 import logging
 from config import Config
 from services.gemini_service import GeminiService
 from services.product_service import ProductService
+from services.search_service import SearchIndex
+from services.seo_service import SEOAuditor
+from services.scheduler_service import GenerationScheduler, PRIORITY_CLASSES
+from services.hedging_service import RequestHedger
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,8 +18,25 @@ app = Flask(__name__)
 CORS(app)
 
 # Initialize services
-gemini_service = GeminiService(Config.GEMINI_API_KEY)
+scheduler = GenerationScheduler(
+    max_concurrency=Config.GEMINI_MAX_CONCURRENCY,
+    requests_per_minute=Config.GEMINI_REQUESTS_PER_MINUTE,
+    weights=Config.SCHEDULER_WEIGHTS,
+    interactive_reserved=Config.SCHEDULER_INTERACTIVE_RESERVED
+)
+hedger = RequestHedger(
+    percentile=Config.HEDGE_PERCENTILE,
+    max_extra_fraction=Config.HEDGE_MAX_EXTRA_FRACTION
+)
+gemini_service = GeminiService(
+    Config.GEMINI_API_KEY,
+    scheduler=scheduler,
+    hedger=hedger,
+    image_settings=Config.IMAGE_SETTINGS
+)
 product_service = ProductService()
+search_index = SearchIndex(Config.SEARCH_INDEX_PATH)
+seo_auditor = SEOAuditor(batch_size=Config.SEO_AUDIT_BATCH_SIZE, poor_score=Config.SEO_POOR_SCORE)
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -23,14 +45,45 @@ def health_check():
 
 @app.route('/api/products', methods=['GET'])
 def get_products():
-    """Get products from demo store API"""
+    """Get products from demo store API, optionally filtered on price, rating and category"""
     try:
-        products = product_service.fetch_products()
-        return jsonify({"success": True, "data": products})
+        catalog = product_service.fetch_catalog()
+        # Never prune the index down to the offline sample products
+        if not product_service.using_sample_data:
+            search_index.sync_catalog(catalog.iter_dicts(), version=product_service.catalog_version)
+            search_index.save_if_dirty(Config.SEARCH_INDEX_SAVE_INTERVAL)
+        
+        filters = {
+            "min_price": request.args.get('min_price', type=float),
+            "max_price": request.args.get('max_price', type=float),
+            "min_rating": request.args.get('min_rating', type=float),
+            "min_reviews": request.args.get('min_reviews', type=int),
+            "category": request.args.getlist('category') or None,
+        }
+        filters = {key: value for key, value in filters.items() if value is not None}
+        rows = catalog.filter(**filters) if filters else None
+        
+        return jsonify({"success": True, "data": catalog.to_dicts(rows)})
     except Exception as e:
         logger.error(f"Error fetching products: {str(e)}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+def _reference_descriptions(product_data, limit=5):
+    """Current description plus those of similar catalog products, for duplicate checks"""
+    references = [product_data.get('description', '')]
+    catalog = product_service.catalog
+    title = product_data.get('title')
+    if catalog is None or not title:
+        return references
+    
+    for hit in search_index.search(title, limit=limit + 1)["hits"]:
+        if hit["id"] == product_data.get('id'):
+            continue
+        product = catalog.get(hit["id"])
+        if product:
+            references.append(product.get('description', ''))
+    return references
+
 @app.route('/api/generate-description', methods=['POST'])
 def generate_description():
     """Generate product description using Gemini API"""
@@ -38,12 +91,61 @@ def generate_description():
         data = request.json
         product_data = data.get('product_data')
         category = data.get('category', 'general')
+        priority = data.get('priority', 'interactive')
         
         if not product_data:
             return jsonify({"success": False, "error": "Product data is required"}), 400
         
-        # Generate description using Gemini
-        result = gemini_service.generate_product_description(product_data, category)
+        if priority not in PRIORITY_CLASSES:
+            return jsonify({"success": False, "error": f"Priority must be one of {', '.join(PRIORITY_CLASSES)}"}), 400
+        
+        # Hedging only pays off for users waiting on the response
+        hedge = Config.HEDGE_GENERATE_DESCRIPTION and priority == 'interactive'
+        
+        # Variants mode: several candidates from one call, ranked locally
+        if data.get('variants'):
+            variants = data['variants']
+            if isinstance(variants, bool) or not isinstance(variants, (int, str)) or not str(variants).strip().isdigit():
+                return jsonify({"success": False, "error": "variants must be a positive integer"}), 400
+            count = min(max(int(variants), 2), Config.MAX_DESCRIPTION_VARIANTS)
+            mode = data.get('variants_mode', 'prompt')
+            if mode not in ('prompt', 'candidates'):
+                return jsonify({"success": False, "error": "variants_mode must be 'prompt' or 'candidates'"}), 400
+            
+            target_words = data.get('target_words')
+            if target_words is not None and not (
+                isinstance(target_words, list) and len(target_words) == 2
+                and all(isinstance(n, (int, float)) and not isinstance(n, bool) for n in target_words)
+                and 0 <= target_words[0] <= target_words[1]
+            ):
+                return jsonify({"success": False, "error": "target_words must be a [min, max] pair of word counts"}), 400
+            
+            focus_keywords = data.get('focus_keywords') or []
+            if not isinstance(focus_keywords, list) or not all(isinstance(k, str) for k in focus_keywords):
+                return jsonify({"success": False, "error": "focus_keywords must be a list of strings"}), 400
+            
+            generated = gemini_service.generate_description_variants(
+                product_data, category, count=count, mode=mode, priority=priority, hedge=hedge
+            )
+            generated["variants"] = seo_auditor.rank_variants(
+                generated["variants"],
+                reference_texts=_reference_descriptions(product_data),
+                focus_keywords=focus_keywords,
+                target_words=target_words
+            )
+            return jsonify({"success": True, "data": generated})
+        
+        # Generate description using Gemini, optionally sending the product image itself
+        include_image = bool(data.get('include_image', Config.INCLUDE_IMAGE_BY_DEFAULT))
+        result = gemini_service.generate_product_description(
+            product_data, category, priority=priority, hedge=hedge, include_image=include_image
+        )
+        
+        # Make generated keywords and features searchable
+        if product_data.get('id') is not None:
+            search_index.upsert_product(product_data)
+            search_index.add_generated_content(product_data.get('id'), result)
+            search_index.save_if_dirty(Config.SEARCH_INDEX_SAVE_INTERVAL)
         
         return jsonify({"success": True, "data": result})
     
@@ -58,11 +160,16 @@ def optimize_seo():
         data = request.json
         content = data.get('content')
         keywords = data.get('keywords', [])
+        priority = data.get('priority', 'interactive')
         
         if not content:
             return jsonify({"success": False, "error": "Content is required"}), 400
         
-        optimized_content = gemini_service.optimize_for_seo(content, keywords)
+        if priority not in PRIORITY_CLASSES:
+            return jsonify({"success": False, "error": f"Priority must be one of {', '.join(PRIORITY_CLASSES)}"}), 400
+        
+        hedge = Config.HEDGE_OPTIMIZE_SEO and priority == 'interactive'
+        optimized_content = gemini_service.optimize_for_seo(content, keywords, priority=priority, hedge=hedge)
         
         return jsonify({"success": True, "data": optimized_content})
     
@@ -70,5 +177,66 @@ def optimize_seo():
         logger.error(f"Error optimizing SEO: {str(e)}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/search', methods=['GET'])
+def search_products():
+    """Full-text search over the catalog and generated content"""
+    try:
+        query = request.args.get('q', '').strip()
+        category = request.args.get('category')
+        limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        
+        if not query:
+            return jsonify({"success": False, "error": "Query parameter 'q' is required"}), 400
+        
+        # Build the index on first use if nothing has been loaded yet
+        if not search_index.stats()["documents"]:
+            catalog = product_service.fetch_catalog()
+            if not product_service.using_sample_data:
+                search_index.sync_catalog(catalog.iter_dicts(), version=product_service.catalog_version)
+                search_index.save_if_dirty()
+        
+        results = search_index.search(query, category=category, limit=limit, offset=offset)
+        
+        return jsonify({"success": True, "data": results})
+    
+    except Exception as e:
+        logger.error(f"Error searching products: {str(e)}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/seo/audit', methods=['POST'])
+def seo_audit():
+    """Score generated content for a whole catalog, streamed as NDJSON"""
+    data = request.json or {}
+    items = data.get('items')
+    
+    if not items or not isinstance(items, list):
+        return jsonify({"success": False, "error": "A list of items is required"}), 400
+    
+    # Reject bad input before streaming starts, while a 400 can still be sent
+    bad = next((i for i, item in enumerate(items) if not isinstance(item, dict)), None)
+    if bad is not None:
+        return jsonify({"success": False, "error": f"Item {bad} must be an object"}), 400
+    
+    def generate():
+        try:
+            for result in seo_auditor.audit(items):
+                yield json.dumps(result) + "\n"
+        except Exception as e:
+            logger.error(f"Error running SEO audit: {str(e)}")
+            yield json.dumps({"error": str(e)}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/scheduler/stats', methods=['GET'])
+def scheduler_stats():
+    """Per-priority queueing latency and load for upstream Gemini calls"""
+    return jsonify({"success": True, "data": scheduler.stats()})
+
+@app.route('/api/hedging/stats', methods=['GET'])
+def hedging_stats():
+    """Hedge rate and tail latency with and without hedging"""
+    return jsonify({"success": True, "data": hedger.stats()})
+
 if __name__ == '__main__':
     app.run(debug=Config.DEBUG, port=Config.FLASK_PORT, host='0.0.0.0')
@@ -0,0 +1,332 @@
+"""
+Multi-process bulk generation over a shared SQLite work table.
+
+The catalog is enqueued once into a WorkQueue database; any number of
+worker processes, on this host or on others that share the volume, then
+lease batches of products from it, generate them and write results back.
+A batch held by a worker that dies is re-issued once its lease expires.
+
+Usage:
+    python batch_worker.py enqueue ../products.json --db work.db --batch-size 20
+    python batch_worker.py work --db work.db --processes 4 --concurrency 4 --rpm 600
+    python batch_worker.py status --db work.db
+    python batch_worker.py export --db work.db -o generated.jsonl
+
+--rpm is the budget for all processes started by one `work` command and
+is split evenly between them; when running on several hosts, give each
+host its share of the upstream quota.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from bulk_generate import generate_record, in_shard, load_catalog, parse_shard
+from config import Config
+from services.scheduler_service import GenerationScheduler
+from services.work_queue import WorkQueue, product_key
+
+logger = logging.getLogger(__name__)
+
+
+class _LeaseKeeper(threading.Thread):
+    """Heartbeats a lease in the background until stopped or lost"""
+
+    def __init__(self, queue, lease):
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.lease = lease
+        self.lost = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        interval = max(0.5, self.queue.lease_seconds / 3)
+        while not self._stop_event.wait(interval):
+            try:
+                if not self.queue.heartbeat(self.lease):
+                    logger.warning(f"Lost lease on batch {self.lease.batch_id}")
+                    self.lost.set()
+                    return
+            except Exception as e:
+                logger.error(f"Error renewing lease on batch {self.lease.batch_id}: {str(e)}")
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _default_service(scheduler):
+    from services.gemini_service import GeminiService
+    return GeminiService(Config.GEMINI_API_KEY, scheduler=scheduler, image_settings=Config.IMAGE_SETTINGS)
+
+
+def process_lease(queue, lease, gemini_service, pool, options):
+    """
+    Generate every product in a lease and write results as they finish
+
+    Returns:
+        tuple: (succeeded, failed) product counts
+    """
+    keeper = _LeaseKeeper(queue, lease)
+    keeper.start()
+    buffer, errors = [], {}
+    succeeded = 0
+    try:
+        futures = {
+            pool.submit(generate_record, gemini_service, product, options.get("category"),
+                        options.get("seo", False), options.get("with_image", False)): product
+            for product in lease.products
+        }
+        for future in as_completed(futures):
+            product = futures[future]
+            if future.cancelled():
+                continue
+            try:
+                buffer.append(future.result())
+                succeeded += 1
+            except Exception as e:
+                logger.error(f"Error generating product {product.get('id')}: {str(e)}")
+                errors[product_key(product)] = str(e)
+                continue
+            if keeper.lost.is_set():
+                # Another worker owns the batch now; stop starting new calls for it
+                for other in futures:
+                    other.cancel()
+            if len(buffer) >= options.get("flush_every", 10):
+                queue.save_results(lease, buffer)
+                buffer = []
+        queue.save_results(lease, buffer)
+    except BaseException:
+        keeper.stop()
+        queue.release(lease)
+        raise
+
+    keeper.stop()
+    state = queue.complete(lease, errors)
+    if state is None:
+        logger.warning(f"Batch {lease.batch_id} was re-issued before this worker finished it")
+    return succeeded, len(errors)
+
+
+def work_loop(db_path, options, service_factory=None):
+    """
+    Lease and process batches until the queue is drained
+
+    Args:
+        db_path (str): Work queue database
+        options (dict): concurrency, rpm, lease_seconds, max_attempts, journal_mode,
+            poll_interval, flush_every, category, seo and with_image
+        service_factory (callable): Builds the generation service from a scheduler;
+            defaults to GeminiService. Must be picklable for spawned workers.
+
+    Returns:
+        dict: Counts of batches and products handled by this worker
+    """
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=options.get("log_level", logging.INFO))
+
+    owner = f"{socket.gethostname()}-{os.getpid()}"
+    queue = WorkQueue(
+        db_path,
+        lease_seconds=options.get("lease_seconds", Config.WORK_LEASE_SECONDS),
+        max_attempts=options.get("max_attempts", Config.WORK_MAX_ATTEMPTS),
+        journal_mode=options.get("journal_mode", Config.WORK_JOURNAL_MODE)
+    )
+    concurrency = options.get("concurrency", Config.GEMINI_MAX_CONCURRENCY)
+    scheduler = GenerationScheduler(
+        max_concurrency=concurrency,
+        requests_per_minute=options.get("rpm", 0),
+        interactive_reserved=0
+    )
+    gemini_service = (service_factory or _default_service)(scheduler)
+
+    summary = {"worker": owner, "batches": 0, "succeeded": 0, "failed": 0}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            lease = queue.lease(owner)
+            if lease is None:
+                if not queue.remaining():
+                    break
+                # Everything left is leased by other workers; wait in case a lease expires
+                time.sleep(options.get("poll_interval", 1.0))
+                continue
+
+            succeeded, failed = process_lease(queue, lease, gemini_service, pool, options)
+            summary["batches"] += 1
+            summary["succeeded"] += succeeded
+            summary["failed"] += failed
+    return summary
+
+
+def _worker_main(db_path, options, service_factory, summaries):
+    """Entry point of one spawned worker: run work_loop and report its summary"""
+    summaries.put(work_loop(db_path, options, service_factory))
+
+
+def run_workers(db_path, processes, options, service_factory=None):
+    """
+    Run work_loop in several spawned processes and wait for all of them
+
+    Each worker is its own process, so one that crashes or is killed does
+    not take the others down. Its batch is re-issued once the lease runs
+    out, and a replacement is started while work remains, up to
+    options["max_respawns"] (default: one per worker).
+
+    Returns:
+        list: Summaries of the workers that exited cleanly
+    """
+    processes = max(1, int(processes))
+    per_process = dict(options)
+    if options.get("rpm"):
+        per_process["rpm"] = options["rpm"] / processes
+    respawns = options.get("max_respawns", processes)
+    poll_interval = options.get("poll_interval", 1.0)
+
+    context = multiprocessing.get_context("spawn")
+    summaries = context.Queue()
+    queue = WorkQueue(db_path, journal_mode=options.get("journal_mode", Config.WORK_JOURNAL_MODE))
+
+    def spawn():
+        worker = context.Process(target=_worker_main, args=(db_path, per_process, service_factory, summaries))
+        worker.start()
+        return worker
+
+    workers = [spawn() for _ in range(processes)]
+    results = []
+    while workers:
+        # Drain summaries while waiting so a worker never blocks on a full pipe
+        while not summaries.empty():
+            results.append(summaries.get())
+        running = []
+        for worker in workers:
+            worker.join(timeout=poll_interval / len(workers))
+            if worker.exitcode is None:
+                running.append(worker)
+            elif worker.exitcode != 0:
+                logger.error(f"Worker process {worker.pid} exited with code {worker.exitcode}")
+                if respawns > 0 and queue.remaining():
+                    respawns -= 1
+                    running.append(spawn())
+        workers = running
+
+    while not summaries.empty():
+        results.append(summaries.get())
+    return results
+
+
+def cmd_enqueue(args):
+    products = load_catalog(args.catalog)
+    if args.shard:
+        products = [p for p in products if in_shard(p, args.shard)]
+    queue = WorkQueue(args.db, journal_mode=args.journal_mode)
+    added = queue.enqueue(products, batch_size=args.batch_size)
+    logger.info(f"Queued {added} new products ({len(products) - added} already queued)")
+    return 0
+
+
+def cmd_work(args):
+    options = {
+        "concurrency": args.concurrency,
+        "rpm": args.rpm,
+        "lease_seconds": args.lease_seconds,
+        "max_attempts": args.max_attempts,
+        "journal_mode": args.journal_mode,
+        "category": args.category,
+        "seo": args.seo,
+        "with_image": args.with_image,
+    }
+    started = time.monotonic()
+    summaries = run_workers(args.db, args.processes, options)
+    elapsed = time.monotonic() - started
+
+    succeeded = sum(s["succeeded"] for s in summaries)
+    failed = sum(s["failed"] for s in summaries)
+    logger.info(
+        f"{args.processes} workers generated {succeeded} products ({failed} failed) "
+        f"in {elapsed:.1f}s, {succeeded / elapsed:.2f} items/s"
+    )
+    remaining = WorkQueue(args.db, journal_mode=args.journal_mode).remaining()
+    if remaining:
+        logger.warning(f"{remaining} batches are still unfinished; run `work` again to resume")
+    return 1 if failed or remaining else 0
+
+
+def cmd_status(args):
+    queue = WorkQueue(args.db, journal_mode=args.journal_mode)
+    if args.retry_failed:
+        logger.info(f"Re-queued {queue.retry_failed()} failed batches")
+    print(json.dumps(queue.stats(), indent=2))
+    return 0
+
+
+def cmd_export(args):
+    queue = WorkQueue(args.db, journal_mode=args.journal_mode)
+    count = 0
+    with open(args.output, 'w', encoding='utf-8') as out:
+        for record in queue.iter_results():
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    logger.info(f"Exported {count} results to {args.output}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Distributed bulk generation over a SQLite work queue")
+    parser.add_argument('--db', default=Config.WORK_DB_PATH, help="Work queue database shared by all workers")
+    parser.add_argument('--journal-mode', default=Config.WORK_JOURNAL_MODE,
+                        help="WAL on a local disk, DELETE on a network volume")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser('enqueue', help="Queue a catalog for generation")
+    enqueue.add_argument('catalog', help="Catalog file: JSON list, {\"products\": [...]} or JSONL")
+    enqueue.add_argument('--batch-size', type=int, default=Config.WORK_BATCH_SIZE, help="Products per lease")
+    enqueue.add_argument('--shard', type=parse_shard, help="Queue only shard i of N, e.g. 0/4")
+    enqueue.set_defaults(func=cmd_enqueue)
+
+    work = commands.add_parser('work', help="Run worker processes until the queue is drained")
+    work.add_argument('--processes', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    work.add_argument('--concurrency', type=int, default=Config.GEMINI_MAX_CONCURRENCY,
+                      help="Parallel upstream calls per process")
+    work.add_argument('--rpm', type=float, default=Config.BULK_REQUESTS_PER_MINUTE,
+                      help="Requests-per-minute budget shared by all processes, 0 for unlimited "
+                           "(default: BULK_REQUESTS_PER_MINUTE)")
+    work.add_argument('--lease-seconds', type=float, default=Config.WORK_LEASE_SECONDS,
+                      help="Lease length; a dead worker's batch is re-issued after this")
+    work.add_argument('--max-attempts', type=int, default=Config.WORK_MAX_ATTEMPTS,
+                      help="Leases per batch before it is marked failed")
+    work.add_argument('--category', help="Override the category passed to the prompt")
+    work.add_argument('--seo', action='store_true', help="Also run SEO optimization per product")
+    work.add_argument('--with-image', dest='with_image', action='store_true',
+                      help="Send the product image to the model (default: INCLUDE_IMAGE_BY_DEFAULT)")
+    work.add_argument('--no-with-image', dest='with_image', action='store_false',
+                      help="Send only the text fields")
+    work.set_defaults(func=cmd_work, with_image=Config.INCLUDE_IMAGE_BY_DEFAULT)
+
+    status = commands.add_parser('status', help="Show queue progress")
+    status.add_argument('--retry-failed', action='store_true', help="Re-queue failed batches first")
+    status.set_defaults(func=cmd_status)
+
+    export = commands.add_parser('export', help="Write results to JSONL in catalog order")
+    export.add_argument('-o', '--output', required=True, help="JSONL file to write")
+    export.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == '__main__':
+    sys.exit(main())
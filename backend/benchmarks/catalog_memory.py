@@ -0,0 +1,94 @@
+"""
+Memory and filter-latency benchmark: list-of-dicts catalog vs CatalogStore.
+
+Builds a synthetic catalog in the demo store format, parses it from JSON the
+way ProductService does, and reports retained bytes per product and the
+latency of a price/rating/category filter for both representations.
+
+Usage (from the backend directory):
+    python -m benchmarks.catalog_memory --products 1000000
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from services.catalog_store import CatalogStore
+
+CATEGORIES = ["electronics", "jewelery", "men's clothing", "women's clothing"]
+WORDS = ("premium quality durable lightweight classic modern slim fit cotton "
+         "wireless portable stainless steel gold silver casual everyday").split()
+
+
+def make_catalog_json(n, seed=0):
+    rng = random.Random(seed)
+    products = []
+    for i in range(1, n + 1):
+        products.append({
+            "id": i,
+            "title": " ".join(rng.choices(WORDS, k=6)).title(),
+            "price": round(rng.uniform(5, 1000), 2),
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(20, 60))),
+            "category": rng.choice(CATEGORIES),
+            "image": f"https://fakestoreapi.com/img/{i}.jpg",
+            "rating": {"rate": round(rng.uniform(1, 5), 1), "count": rng.randint(0, 1000)},
+        })
+    return json.dumps(products)
+
+
+def measure(build):
+    """Return (result, retained bytes) for a zero-argument builder"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def time_filter(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        matches = func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1000000)
+    args = parser.parse_args()
+    n = args.products
+
+    raw = make_catalog_json(n)
+
+    dicts, dict_bytes = measure(lambda: json.loads(raw))
+    dict_ms, dict_matches = time_filter(lambda: [
+        p for p in dicts
+        if 50 <= p["price"] <= 200 and p["rating"]["rate"] >= 4.0 and p["category"] == "electronics"
+    ])
+    del dicts
+
+    store, store_bytes = measure(lambda: CatalogStore.from_products(json.loads(raw)))
+    store_ms, store_rows = time_filter(lambda: store.filter(
+        min_price=50, max_price=200, min_rating=4.0, category="electronics"
+    ))
+
+    assert len(dict_matches) == len(store_rows)
+
+    print(f"products:            {n}")
+    print(f"{'':20} {'bytes/product':>14} {'filter ms':>10}")
+    print(f"{'list of dicts':20} {dict_bytes / n:14.1f} {dict_ms:10.2f}")
+    print(f"{'CatalogStore':20} {store_bytes / n:14.1f} {store_ms:10.2f}")
+    print(f"memory reduction:    {dict_bytes / store_bytes:.1f}x")
+    print(f"filter speedup:      {dict_ms / store_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Query latency benchmark for SearchIndex over a synthetic catalog.
+
+Products draw titles and descriptions from a small shared vocabulary of
+common product words plus a long Zipf-distributed tail, so popular terms
+such as "cotton" match a large share of the catalog the way they do in a
+real store. Reports the first (cold) run of each query shape, which
+materializes the term arrays, and p50/p95/max latency of the warm runs.
+
+Usage (from the backend directory):
+    python -m benchmarks.search_latency --products 100000
+"""
+
+import argparse
+import itertools
+import random
+import time
+
+from services.search_service import SearchIndex
+
+CATEGORIES = ["electronics", "jewelery", "men's clothing", "women's clothing", "home", "sports"]
+COMMON = ("premium quality durable lightweight classic modern slim fit cotton "
+          "wireless portable stainless steel gold silver casual everyday").split()
+
+QUERIES = [
+    ("single common term", "cotton", None),
+    ("two common terms", "wireless portable", None),
+    ("three terms", "classic slim cotton", None),
+    ("two-letter prefix", "co", None),
+    ("prefix on last term", "wireless po", None),
+    ("typo", "wireles", None),
+    ("rare term", "tail42", None),
+    ("term + category", "cotton", "electronics"),
+    ("page 5", "cotton", None),
+]
+
+
+def make_products(n, seed=0):
+    rng = random.Random(seed)
+    tail = [f"tail{i}" for i in range(20000)]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(tail))))
+
+    def words(k):
+        common = rng.choices(COMMON, k=k // 2)
+        rare = rng.choices(tail, cum_weights=cum_weights, k=k - k // 2)
+        return " ".join(common + rare)
+
+    return [{
+        "id": i,
+        "title": words(6),
+        "description": words(30),
+        "category": rng.choice(CATEGORIES),
+    } for i in range(1, n + 1)]
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    products = make_products(args.products)
+    index = SearchIndex()
+    started = time.perf_counter()
+    index.sync_catalog(products)
+    print(f"products: {args.products}  build: {time.perf_counter() - started:.1f}s  "
+          f"terms: {index.stats()['terms']}")
+    print(f"{'query':22} {'matches':>8} {'cold ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+
+    for name, query, category in QUERIES:
+        offset = 80 if name == "page 5" else 0
+        t0 = time.perf_counter()
+        index.search(query, category=category, offset=offset)
+        cold = (time.perf_counter() - t0) * 1000
+        samples = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            result = index.search(query, category=category, offset=offset)
+            samples.append((time.perf_counter() - t0) * 1000)
+        print(f"{name:22} {result['total']:8d} {cold:8.2f} {percentile(samples, 0.5):8.2f} "
+              f"{percentile(samples, 0.95):8.2f} {max(samples):8.2f}")
+
+
+if __name__ == "__main__":
+    main()
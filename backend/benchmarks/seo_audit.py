@@ -0,0 +1,67 @@
+"""
+Throughput benchmark for SEOAuditor.audit over synthetic generated content.
+
+Each item has an SEO title, a meta description, a description of
+--words words drawn from common product words plus a Zipf-distributed
+tail, and a handful of keywords including a two-word phrase. A share of
+the items are exact or near copies of earlier ones, so duplicate
+detection has real work to do.
+
+Usage (from the backend directory):
+    python -m benchmarks.seo_audit --items 100000 --words 200
+"""
+
+import argparse
+import itertools
+import random
+import time
+
+from benchmarks.search_latency import COMMON
+from services.seo_service import SEOAuditor
+
+
+def make_items(n, words, seed=0):
+    rng = random.Random(seed)
+    tail = [f"tail{i}" for i in range(20000)]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(tail))))
+
+    items = []
+    for i in range(n):
+        text = rng.choices(COMMON, k=words // 2) + rng.choices(tail, cum_weights=cum_weights, k=words - words // 2)
+        rng.shuffle(text)
+        description = " ".join(w + ("." if j % 15 == 14 else "") for j, w in enumerate(text))
+        if items and i % 50 == 0:
+            description = items[rng.randrange(len(items))]["description"]
+        elif items and i % 50 == 1:
+            description = items[rng.randrange(len(items))]["description"] + " with a small change"
+        items.append({
+            "product_id": i,
+            "seo_title": " ".join(rng.choices(COMMON, k=6)).title(),
+            "meta_description": " ".join(rng.choices(COMMON, k=18)),
+            "description": description,
+            "keywords": rng.sample(COMMON, 5) + ["slim fit"],
+        })
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--words", type=int, default=200, help="Words per description")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    items = make_items(args.items, args.words)
+    auditor = SEOAuditor(batch_size=args.batch_size)
+    started = time.perf_counter()
+    results = list(auditor.audit(items))
+    elapsed = time.perf_counter() - started
+
+    summary = results[-1]["summary"]
+    print(f"items: {args.items}  words/description: {args.words}  batch size: {args.batch_size}")
+    print(f"audit: {elapsed:.2f}s  {args.items / elapsed:,.0f} items/s  "
+          f"duplicates flagged: {summary['issues'].get('duplicate_content', 0)}")
+
+
+if __name__ == "__main__":
+    main()
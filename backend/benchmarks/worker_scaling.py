@@ -0,0 +1,222 @@
+"""
+Scaling benchmark for batch_worker: throughput vs number of worker processes.
+
+Runs the real work queue, worker loop and GeminiService prompt building and
+response parsing against a local LLM stand-in instead of the Gemini API.
+The stand-in is an HTTP server in this process that answers after a
+simulated latency and admits at most --quota-rpm requests per minute,
+holding the rest back like an upstream quota would. Each worker also
+burns --cpu-ms of GIL-bound CPU per call to model prompt, JSON and image
+work. Throughput should grow roughly linearly with workers until it
+reaches the quota line.
+
+"wall s" includes spawning the workers and waiting out abandoned leases;
+"steady/s" is the completion rate between the first and last result.
+
+With --abandon N, N batches are leased by a fake worker that never
+returns, to show them being re-issued after the lease expires.
+
+Usage (from the backend directory):
+    python -m benchmarks.worker_scaling --products 400 --workers 1,2,4,8
+"""
+
+import argparse
+import functools
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from batch_worker import run_workers
+from services.work_queue import WorkQueue
+
+WORDS = ("premium quality durable lightweight classic modern slim fit cotton "
+         "wireless portable stainless steel gold silver casual everyday").split()
+
+
+class _Quota:
+    """Strict pacing of stand-in requests to the quota rate, with no burst"""
+
+    def __init__(self, rpm):
+        self.rate = rpm / 60.0 if rpm else 0.0
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(1.0, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+def start_stand_in(latency_ms, quota_rpm, seed=0):
+    """Start the local LLM stand-in and return (server, url)"""
+    quota = _Quota(quota_rpm)
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            prompt = json.loads(body)["prompt"]
+            quota.wait()
+            with rng_lock:
+                # Log-normal latency with a long tail, as seen from real model APIs
+                delay = latency_ms / 1000.0 * rng.lognormvariate(0, 0.4)
+                words = rng.choices(WORDS, k=120)
+            time.sleep(delay)
+
+            text = json.dumps({
+                "seo_title": " ".join(words[:8]).title(),
+                "description": " ".join(words),
+                "features": [" ".join(words[i:i + 4]) for i in range(0, 40, 8)],
+                "specifications": {"Material": words[0], "Finish": words[1]},
+                "keywords": words[:8],
+            })
+            payload = json.dumps({"text": text, "prompt_tokens": len(prompt) // 4,
+                                  "output_tokens": len(text) // 4}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/generate"
+
+
+class LocalModel:
+    """Drop-in for genai.GenerativeModel that calls the stand-in server"""
+
+    def __init__(self, url, cpu_ms):
+        self.url = url
+        self.cpu_ms = cpu_ms
+
+    def generate_content(self, prompt, **kwargs):
+        burn_cpu(self.cpu_ms)
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({"prompt": prompt if isinstance(prompt, str) else str(prompt)}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=60) as response:
+            data = json.loads(response.read())
+        return SimpleNamespace(
+            text=data["text"],
+            usage_metadata=SimpleNamespace(prompt_token_count=data["prompt_tokens"],
+                                           candidates_token_count=data["output_tokens"]),
+        )
+
+
+def burn_cpu(cpu_ms):
+    """Pure-Python work that holds the GIL for cpu_ms of thread CPU time"""
+    end = time.thread_time() + cpu_ms / 1000.0
+    while time.thread_time() < end:
+        sum(i * i for i in range(500))
+
+
+def local_service(url, cpu_ms, scheduler):
+    """Service factory for workers: a real GeminiService wired to the stand-in"""
+    from services.gemini_service import GeminiService
+    service = GeminiService("local-benchmark", scheduler=scheduler)
+    service.model = LocalModel(url, cpu_ms)
+    return service
+
+
+def make_products(n, seed=0):
+    rng = random.Random(seed)
+    return [{
+        "id": i,
+        "title": " ".join(rng.choices(WORDS, k=6)).title(),
+        "price": round(rng.uniform(5, 1000), 2),
+        "description": " ".join(rng.choices(WORDS, k=30)),
+        "category": "electronics",
+        "image": f"https://fakestoreapi.com/img/{i}.jpg",
+        "rating": {"rate": round(rng.uniform(1, 5), 1), "count": rng.randint(0, 1000)},
+    } for i in range(1, n + 1)]
+
+
+def run_once(workdir, workers, products, args, url):
+    db_path = os.path.join(workdir, f"work-{workers}.db")
+    queue = WorkQueue(db_path, lease_seconds=args.lease_seconds)
+    queue.enqueue(products, batch_size=args.batch_size)
+    for _ in range(args.abandon):
+        queue.lease("abandoned-worker")
+
+    options = {
+        "concurrency": args.concurrency,
+        "lease_seconds": args.lease_seconds,
+        "poll_interval": min(1.0, args.lease_seconds / 4),
+        # Write every result on its own so finish times are exact for the steady-state rate
+        "flush_every": 1,
+        "log_level": "WARNING",
+    }
+    started = time.monotonic()
+    run_workers(db_path, workers, options, functools.partial(local_service, url, args.cpu_ms))
+    elapsed = time.monotonic() - started
+
+    stats = queue.stats()
+    assert stats["results"] == len(products), stats
+    return elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=400)
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker process counts")
+    parser.add_argument("--concurrency", type=int, default=4, help="Upstream calls in flight per worker")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Median stand-in latency")
+    parser.add_argument("--cpu-ms", type=float, default=10.0, help="GIL-bound CPU per call in the worker")
+    parser.add_argument("--quota-rpm", type=float, default=6000.0, help="Stand-in upstream quota, 0 for none")
+    parser.add_argument("--lease-seconds", type=float, default=5.0)
+    parser.add_argument("--abandon", type=int, default=0, help="Batches leased by a worker that never returns")
+    args = parser.parse_args()
+
+    counts = [int(c) for c in args.workers.split(",")]
+    products = make_products(args.products)
+    server, url = start_stand_in(args.latency_ms, args.quota_rpm)
+    workdir = tempfile.mkdtemp(prefix="worker-scaling-")
+
+    quota = f"{args.quota_rpm / 60.0:.1f} req/s" if args.quota_rpm else "none"
+    print(f"products: {args.products}  concurrency/worker: {args.concurrency}  "
+          f"latency: {args.latency_ms:.0f} ms  cpu: {args.cpu_ms:.0f} ms  quota: {quota}")
+    print(f"{'workers':>7} {'wall s':>8} {'items/s':>8} {'steady/s':>9} {'speedup':>8} {'reissued':>9}")
+    try:
+        baseline = None
+        for workers in counts:
+            elapsed, stats = run_once(workdir, workers, products, args, url)
+            rate = args.products / elapsed
+            steady = stats["items_per_second"] or rate
+            baseline = baseline or steady
+            print(f"{workers:7d} {elapsed:8.2f} {rate:8.2f} {steady:9.2f} "
+                  f"{steady / baseline:7.2f}x {stats['reissued_leases']:9d}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
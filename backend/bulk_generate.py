@@ -0,0 +1,323 @@
+"""
+Offline bulk generation over a product catalog.
+
+Runs GeminiService description (and optionally SEO) generation over every
+product in a catalog file and streams results to a JSONL output. Progress is
+checkpointed atomically, so re-running the same command after an
+interruption skips products that were already paid for.
+
+Usage:
+    python bulk_generate.py ../products.json -o generated.jsonl --concurrency 4
+    python bulk_generate.py catalog.jsonl -o shard0.jsonl --shard 0/4 --seo
+
+Calls are queued at batch priority, but the scheduler lives in this
+process: it does not share a budget with the Flask server's interactive
+traffic. --rpm therefore defaults to BULK_REQUESTS_PER_MINUTE, a bounded
+share of the quota; keep the bulk rate plus the server's
+GEMINI_REQUESTS_PER_MINUTE within the upstream limit.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import Config
+from services.gemini_service import GeminiService
+from services.scheduler_service import BATCH, GenerationScheduler
+from services.work_queue import product_key, record_key
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 2
+
+
+def load_catalog(path):
+    """
+    Load products from a JSON list, a {"products": [...]} document or JSONL
+
+    Args:
+        path (str): Path to the catalog file
+
+    Returns:
+        list: Product dicts
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+
+    if isinstance(data, dict) and "products" in data:
+        return data["products"]
+    return data
+
+
+def parse_shard(value):
+    """Parse an 'i/N' shard spec into (index, count)"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError("Shard must look like i/N, e.g. 0/4")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError("Shard index must satisfy 0 <= i < N")
+    return index, count
+
+
+def in_shard(product, shard):
+    """Stable assignment of a product to a shard by hashing its ID, or its content if it has none"""
+    index, count = shard
+    product_id = product.get('id')
+    key = str(product_id) if product_id is not None else product_key(product)
+    return zlib.crc32(key.encode('utf-8')) % count == index
+
+
+class Checkpoint:
+    """
+    Tracks finished products for one output file
+
+    The output JSONL is append-only and fsynced per batch of records; the
+    checkpoint only stores the output length those records cover and is
+    replaced atomically, so saving it costs the same at any run size. On
+    load the finished set is rebuilt by replaying the output: complete
+    lines written after the last checkpoint are kept and a torn final
+    line is truncated away. A bad line anywhere else is an error.
+    """
+
+    def __init__(self, output_path, checkpoint_path=None):
+        self.output_path = output_path
+        self.path = checkpoint_path or f"{output_path}.checkpoint"
+        self.done = set()
+        self.offset = 0
+        self._load()
+
+    def _load(self):
+        checkpointed = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get("version") not in (1, CHECKPOINT_VERSION):
+                raise ValueError(f"Unsupported checkpoint format in {self.path}")
+            checkpointed = state["offset"]
+
+        if not os.path.exists(self.output_path):
+            return
+
+        if os.path.getsize(self.output_path) < checkpointed:
+            logger.warning(f"{self.output_path} is shorter than its checkpoint, rescanning it")
+            checkpointed = 0
+
+        with open(self.output_path, 'rb+') as f:
+            good_end = 0
+            for line in f:
+                record = None
+                if line.endswith(b'\n'):
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        pass
+                if record is None:
+                    # Only the last line can be torn by a crash; anything else is corruption
+                    if good_end < checkpointed or f.read(1):
+                        raise ValueError(f"Corrupt record at byte {good_end} of {self.output_path}")
+                    break
+                self.done.add(record_key(record))
+                good_end += len(line)
+            f.truncate(good_end)
+        self.offset = good_end
+
+    def save(self, offset):
+        self.offset = offset
+        state = {"version": CHECKPOINT_VERSION, "offset": offset}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class ProgressReporter:
+    """Prints throughput and ETA to stderr at most once per interval"""
+
+    def __init__(self, total, interval=2.0, stream=sys.stderr):
+        self.total = total
+        self.interval = interval
+        self.stream = stream
+        self.started = time.monotonic()
+        self._last = 0.0
+        self.succeeded = 0
+        self.failed = 0
+
+    def update(self, ok, force=False):
+        if ok:
+            self.succeeded += 1
+        elif ok is not None:
+            self.failed += 1
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+
+        finished = self.succeeded + self.failed
+        elapsed = max(now - self.started, 1e-9)
+        rate = finished / elapsed
+        remaining = self.total - finished
+        eta = remaining / rate if rate else float('inf')
+        eta_text = time.strftime('%H:%M:%S', time.gmtime(eta)) if eta != float('inf') else '--:--:--'
+        self.stream.write(
+            f"\r{finished}/{self.total} done ({self.failed} failed) "
+            f"{rate:.2f} items/s ETA {eta_text}"
+        )
+        self.stream.flush()
+
+
+def generate_record(gemini_service, product, category=None, with_seo=False, with_image=False):
+    """Run description (and optional SEO) generation for one product"""
+    started = time.monotonic()
+    content = gemini_service.generate_product_description(
+        product, category or product.get('category', 'general'), priority=BATCH, include_image=with_image
+    )
+    record = {"id": product.get('id'), "generated_content": content}
+    if product.get('id') is None:
+        record["key"] = product_key(product)
+
+    if with_seo:
+        record["seo"] = gemini_service.optimize_for_seo(
+            content.get('description', ''), content.get('keywords', []), priority=BATCH
+        )
+
+    record["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+    return record
+
+
+def run(args):
+    products = load_catalog(args.catalog)
+    if args.shard:
+        products = [p for p in products if in_shard(p, args.shard)]
+
+    checkpoint = Checkpoint(args.output, args.checkpoint)
+    pending = [p for p in products if product_key(p) not in checkpoint.done]
+    already_done = len(products) - len(pending)
+    if args.limit:
+        pending = pending[:args.limit]
+
+    logger.info(
+        f"{len(products)} products in scope, {already_done} already done, "
+        f"{len(pending)} to generate"
+    )
+    if not pending:
+        return 0
+
+    scheduler = GenerationScheduler(
+        max_concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        interactive_reserved=0
+    )
+    gemini_service = GeminiService(
+        Config.GEMINI_API_KEY,
+        scheduler=scheduler,
+        image_settings=Config.IMAGE_SETTINGS
+    )
+    progress = ProgressReporter(len(pending))
+    write_lock = threading.Lock()
+    unsaved = 0
+
+    # Shut down by hand: leaving a with-block would wait for in-flight calls
+    # even after a second Ctrl-C, and their results would never be written
+    pool = ThreadPoolExecutor(max_workers=args.concurrency)
+    handled = set()
+
+    def collect(future, product):
+        nonlocal unsaved
+        handled.add(future)
+        try:
+            record = future.result()
+        except Exception as e:
+            logger.error(f"Error generating product {product_key(product)}: {str(e)}")
+            progress.update(False)
+            return
+
+        with write_lock:
+            out.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+            checkpoint.done.add(record_key(record))
+            unsaved += 1
+            if unsaved >= args.checkpoint_every:
+                out.flush()
+                os.fsync(out.fileno())
+                checkpoint.save(out.tell())
+                unsaved = 0
+        progress.update(True)
+
+    try:
+        with open(args.output, 'ab') as out:
+            futures = {
+                pool.submit(generate_record, gemini_service, product, args.category, args.seo, args.with_image): product
+                for product in pending
+            }
+            try:
+                for future in as_completed(futures):
+                    collect(future, futures[future])
+            except KeyboardInterrupt:
+                # Requests already sent are paid for: keep their results, drop the rest
+                running = [f for f in futures if f not in handled and not f.cancel()]
+                logger.warning(f"Interrupted, waiting for {len(running)} requests in flight "
+                               f"(Ctrl-C again to abandon them)")
+                try:
+                    for future in as_completed(running):
+                        collect(future, futures[future])
+                except KeyboardInterrupt:
+                    logger.warning("Abandoning requests in flight")
+                raise
+            finally:
+                with write_lock:
+                    out.flush()
+                    os.fsync(out.fileno())
+                    checkpoint.save(out.tell())
+                progress.update(None, force=True)
+                sys.stderr.write("\n")
+    finally:
+        pool.shutdown(wait=False)
+
+    return 1 if progress.failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Bulk-generate product descriptions with Gemini")
+    parser.add_argument('catalog', help="Catalog file: JSON list, {\"products\": [...]} or JSONL")
+    parser.add_argument('-o', '--output', required=True, help="JSONL file to append results to")
+    parser.add_argument('--checkpoint', help="Checkpoint path (default: <output>.checkpoint)")
+    parser.add_argument('--concurrency', type=int, default=Config.GEMINI_MAX_CONCURRENCY,
+                        help="Parallel upstream calls")
+    parser.add_argument('--rpm', type=float, default=Config.BULK_REQUESTS_PER_MINUTE,
+                        help="Requests-per-minute budget for this run, 0 for unlimited; "
+                             "not shared with the server's interactive traffic")
+    parser.add_argument('--shard', type=parse_shard, help="Process only shard i of N, e.g. 0/4")
+    parser.add_argument('--category', help="Override the category passed to the prompt")
+    parser.add_argument('--seo', action='store_true', help="Also run SEO optimization per product")
+    parser.add_argument('--with-image', dest='with_image', action='store_true',
+                        help="Send the product image to the model (default: INCLUDE_IMAGE_BY_DEFAULT)")
+    parser.add_argument('--no-with-image', dest='with_image', action='store_false',
+                        help="Send only the text fields")
+    parser.add_argument('--limit', type=int, help="Stop after this many new products")
+    parser.add_argument('--checkpoint-every', type=int, default=10,
+                        help="Records between checkpoint saves")
+    parser.set_defaults(with_image=Config.INCLUDE_IMAGE_BY_DEFAULT)
+    return parser
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+    try:
+        return run(args)
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,3 +10,62 @@ class Config:
     
     # Demo store API (using a mock API for demo)
     DEMO_STORE_API_URL = "https://raw.githubusercontent.com/IshikaGarg787/Product-Description-Generator/main/products.json"
+
+    # Local full-text search index
+    SEARCH_INDEX_PATH = os.getenv('SEARCH_INDEX_PATH', 'data/search_index.pkl')
+    SEARCH_INDEX_SAVE_INTERVAL = int(os.getenv('SEARCH_INDEX_SAVE_INTERVAL', 30))
+
+    # Catalog-wide SEO audit
+    SEO_AUDIT_BATCH_SIZE = int(os.getenv('SEO_AUDIT_BATCH_SIZE', 1000))
+    SEO_POOR_SCORE = float(os.getenv('SEO_POOR_SCORE', 60))
+
+    # Upstream Gemini budget shared by interactive, batch and background traffic
+    GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', 8))
+    GEMINI_REQUESTS_PER_MINUTE = float(os.getenv('GEMINI_REQUESTS_PER_MINUTE', 0))
+    SCHEDULER_WEIGHTS = {
+        'interactive': int(os.getenv('SCHEDULER_WEIGHT_INTERACTIVE', 8)),
+        'batch': int(os.getenv('SCHEDULER_WEIGHT_BATCH', 3)),
+        'background': int(os.getenv('SCHEDULER_WEIGHT_BACKGROUND', 1)),
+    }
+    SCHEDULER_INTERACTIVE_RESERVED = int(os.getenv('SCHEDULER_INTERACTIVE_RESERVED', 2))
+    # Offline bulk runs use their own scheduler in a separate process and cannot see
+    # server traffic, so they get a bounded share of the quota: half the server budget
+    # if one is set, otherwise 60 requests per minute
+    BULK_REQUESTS_PER_MINUTE = float(
+        os.getenv('BULK_REQUESTS_PER_MINUTE') or (GEMINI_REQUESTS_PER_MINUTE / 2) or 60
+    )
+
+    # Request hedging for interactive Gemini calls
+    HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', 0.95))
+    HEDGE_MAX_EXTRA_FRACTION = float(os.getenv('HEDGE_MAX_EXTRA_FRACTION', 0.05))
+    HEDGE_GENERATE_DESCRIPTION = os.getenv('HEDGE_GENERATE_DESCRIPTION', 'True').lower() == 'true'
+    HEDGE_OPTIMIZE_SEO = os.getenv('HEDGE_OPTIMIZE_SEO', 'True').lower() == 'true'
+
+    # Multi-variant generation
+    MAX_DESCRIPTION_VARIANTS = int(os.getenv('MAX_DESCRIPTION_VARIANTS', 4))
+
+    # Vision-grounded generation
+    INCLUDE_IMAGE_BY_DEFAULT = os.getenv('INCLUDE_IMAGE_BY_DEFAULT', 'False').lower() == 'true'
+    IMAGE_MAX_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', 768 * 768))
+    IMAGE_MAX_SIDE = int(os.getenv('IMAGE_MAX_SIDE', 768))
+    IMAGE_QUALITY = int(os.getenv('IMAGE_QUALITY', 80))
+    IMAGE_FORMAT = os.getenv('IMAGE_FORMAT', 'JPEG')
+    IMAGE_UPLOAD = os.getenv('IMAGE_UPLOAD', 'False').lower() == 'true'
+    IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR')
+    IMAGE_URL_TTL = float(os.getenv('IMAGE_URL_TTL', 3600))
+    IMAGE_SETTINGS = {
+        'max_pixels': IMAGE_MAX_PIXELS,
+        'max_side': IMAGE_MAX_SIDE,
+        'quality': IMAGE_QUALITY,
+        'format': IMAGE_FORMAT,
+        'upload': IMAGE_UPLOAD,
+        'cache_dir': IMAGE_CACHE_DIR,
+        'url_ttl': IMAGE_URL_TTL,
+    }
+
+    # Multi-process bulk generation over a shared SQLite work queue
+    WORK_DB_PATH = os.getenv('WORK_DB_PATH', 'work_queue.db')
+    WORK_JOURNAL_MODE = os.getenv('WORK_JOURNAL_MODE', 'WAL')
+    WORK_BATCH_SIZE = int(os.getenv('WORK_BATCH_SIZE', 20))
+    WORK_LEASE_SECONDS = float(os.getenv('WORK_LEASE_SECONDS', 120))
+    WORK_MAX_ATTEMPTS = int(os.getenv('WORK_MAX_ATTEMPTS', 3))
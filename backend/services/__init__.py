@@ -8,6 +8,12 @@ __author__ = "E-commerce Product Generator"
 
 # Import main services for easy access
 from .gemini_service import GeminiService
+from .catalog_store import CatalogStore
 from .product_service import ProductService
+from .search_service import SearchIndex
+from .seo_service import SEOAuditor
+from .scheduler_service import GenerationScheduler
+from .hedging_service import RequestHedger
+from .work_queue import WorkQueue
 
-__all__ = ['GeminiService', 'ProductService']
\ No newline at end of file
+__all__ = ['GeminiService', 'ProductService', 'SearchIndex', 'SEOAuditor', 'GenerationScheduler', 'CatalogStore', 'RequestHedger', 'WorkQueue']
\ No newline at end of file
@@ -0,0 +1,296 @@
+import logging
+import sys
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _number(value, kind=float):
+    """Parse a numeric field, or None if it is absent or not a number"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = kind(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if kind is int and not -2**31 <= number < 2**31:
+        return None
+    return number
+
+
+class _TextColumn:
+    """Strings stored back to back in one UTF-8 blob, decoded per row on access"""
+
+    __slots__ = ("blob", "offsets")
+
+    def __init__(self, values):
+        encoded = [("" if value is None else str(value)).encode("utf-8") for value in values]
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            np.cumsum([len(e) for e in encoded], out=self.offsets[1:])
+        self.blob = b"".join(encoded)
+
+    def __getitem__(self, row):
+        return self.blob[self.offsets[row]:self.offsets[row + 1]].decode("utf-8")
+
+    @property
+    def nbytes(self):
+        return self.offsets.nbytes + sys.getsizeof(self.blob)
+
+
+class CatalogStore:
+    """
+    Compact, column-oriented in-memory product catalog
+
+    Numeric fields live in NumPy arrays, categories are stored as small
+    integer codes into a table of interned strings, and title, image and
+    description text are each kept as one UTF-8 blob that is only decoded
+    for the rows that are read. Dict views are produced on demand at the
+    API boundary.
+
+    Integer IDs are kept in an int64 column looked up by binary search;
+    any other IDs (e.g. string SKUs) fall back to an object column with a
+    key-to-row dict. Fields a product does not have (or has as null) are
+    recorded in per-field masks, so dict views leave them out instead of
+    reporting zeros, and filters never match them. Values of the wrong type
+    (a price of "N/A", a numeric title) are stored as missing or as text,
+    and the original value is kept with the extras so dict views return it
+    unchanged.
+    """
+
+    TEXT_FIELDS = ("title", "description", "category", "image")
+
+    CORE_FIELDS = ("id", "title", "price", "description", "category", "image", "rating")
+    # Fields tracked for absence; "rate" and "count" live inside "rating"
+    OPTIONAL_FIELDS = CORE_FIELDS + ("rate", "count")
+
+    def __init__(self, ids, prices, rates, counts, category_codes, categories,
+                 titles, images, descriptions, extras, missing=None):
+        self.ids = ids
+        self.prices = prices
+        self.rates = rates
+        self.counts = counts
+        self.category_codes = category_codes
+        self.categories = categories
+        self._titles = titles
+        self._images = images
+        self._descriptions = descriptions
+        self._extras = extras
+        self._missing = missing or {}  # field -> bool mask of rows without it
+
+        if ids.dtype == object:
+            self._row_of = {}
+            for row, product_id in enumerate(ids.tolist()):
+                if product_id is not None:
+                    self._row_of.setdefault(product_id, row)
+            self._id_order = self._sorted_ids = None
+        else:
+            self._row_of = None
+            self._id_order = np.argsort(ids, kind="stable")
+            self._sorted_ids = ids[self._id_order]
+
+    @classmethod
+    def from_products(cls, products):
+        """
+        Build a store from an iterable of product dicts
+
+        Args:
+            products (iterable): Product dicts in the demo store format
+
+        Returns:
+            CatalogStore: Column-oriented copy of the catalog
+        """
+        products = products if isinstance(products, list) else list(products)
+        n = len(products)
+
+        raw_ids = [product.get("id") for product in products]
+        integer_ids = all(isinstance(i, (int, np.integer)) and not isinstance(i, bool) for i in raw_ids)
+        if integer_ids:
+            ids = np.array(raw_ids, dtype=np.int64) if n else np.empty(0, dtype=np.int64)
+        else:
+            ids = np.empty(n, dtype=object)
+            ids[:] = raw_ids
+        prices = np.empty(n, dtype=np.float64)
+        rates = np.empty(n, dtype=np.float32)
+        counts = np.empty(n, dtype=np.int32)
+        category_codes = np.empty(n, dtype=np.int32)
+
+        category_index = {}
+        categories = []
+        extras = {}
+        missing = {}
+
+        def mark_missing(field, row):
+            mask = missing.get(field)
+            if mask is None:
+                mask = missing[field] = np.zeros(n, dtype=bool)
+            mask[row] = True
+
+        for row, product in enumerate(products):
+            for field in cls.CORE_FIELDS:
+                if product.get(field) is None:
+                    mark_missing(field, row)
+
+            # Anything beyond the core schema (e.g. specifications) is kept sparsely
+            extra = {k: v for k, v in product.items() if k not in cls.CORE_FIELDS}
+
+            rating = product.get("rating")
+            if rating is not None and not isinstance(rating, dict):
+                extra["rating"] = rating
+            rating = rating if isinstance(rating, dict) else {}
+            price = _number(product.get("price"))
+            rate, count = _number(rating.get("rate")), _number(rating.get("count"), int)
+            prices[row] = price if price is not None else np.nan
+            rates[row] = rate if rate is not None else np.nan
+            counts[row] = count if count is not None else 0
+            if price is None and product.get("price") is not None:
+                mark_missing("price", row)
+                extra["price"] = product["price"]
+            if rate is None:
+                mark_missing("rate", row)
+            if count is None:
+                mark_missing("count", row)
+            if (rate is None and rating.get("rate") is not None) or (count is None and rating.get("count") is not None):
+                extra["rating"] = rating
+
+            for field in cls.TEXT_FIELDS:
+                value = product.get(field)
+                if value is not None and not isinstance(value, str):
+                    extra[field] = value
+
+            category = product.get("category")
+            category = "" if category is None else str(category)
+            code = category_index.get(category)
+            if code is None:
+                code = category_index[category] = len(categories)
+                categories.append(sys.intern(category))
+            category_codes[row] = code
+
+            if extra:
+                extras[row] = extra
+
+        return cls(ids, prices, rates, counts, category_codes, categories,
+                   _TextColumn(p.get("title") for p in products),
+                   _TextColumn(p.get("image") for p in products),
+                   _TextColumn(p.get("description") for p in products),
+                   extras, missing)
+
+    def __len__(self):
+        return int(self.ids.size)
+
+    def row_for_id(self, product_id):
+        """Row index of a product ID, or None if it is not in the catalog"""
+        if self._row_of is not None:
+            try:
+                return self._row_of.get(product_id)
+            except TypeError:
+                return None
+        if not isinstance(product_id, (int, np.integer)) or isinstance(product_id, bool):
+            return None
+        pos = int(np.searchsorted(self._sorted_ids, product_id))
+        if pos < self._sorted_ids.size and self._sorted_ids[pos] == product_id:
+            return int(self._id_order[pos])
+        return None
+
+    def title(self, row):
+        return self._titles[row]
+
+    def description(self, row):
+        """Decode the description of a single row"""
+        return self._descriptions[row]
+
+    def category(self, row):
+        return self.categories[self.category_codes[row]]
+
+    def get(self, product_id):
+        """Dict view of one product, or None if the ID is unknown"""
+        row = self.row_for_id(product_id)
+        return self.to_dict(row) if row is not None else None
+
+    def has(self, field, row):
+        """False if the product at row had no value for field"""
+        mask = self._missing.get(field)
+        return mask is None or not mask[row]
+
+    def to_dict(self, row):
+        """Materialize one row in the original product dict format"""
+        product_id = self.ids[row]
+        product = {
+            "id": int(product_id) if self._row_of is None else product_id,
+            "title": self._titles[row],
+            "price": float(self.prices[row]),
+            "description": self.description(row),
+            "category": self.category(row),
+            "image": self._images[row],
+        }
+        rating = {}
+        if self.has("rate", row):
+            rating["rate"] = round(float(self.rates[row]), 2)
+        if self.has("count", row):
+            rating["count"] = int(self.counts[row])
+        product["rating"] = rating
+        if self._missing:
+            for field in self.CORE_FIELDS:
+                if not self.has(field, row):
+                    del product[field]
+        extra = self._extras.get(row)
+        if extra:
+            product.update(extra)
+        return product
+
+    def to_dicts(self, rows=None):
+        """Materialize the given rows (default: all) as product dicts"""
+        if rows is None:
+            rows = range(len(self))
+        return [self.to_dict(int(row)) for row in rows]
+
+    def filter(self, min_price=None, max_price=None, min_rating=None, min_reviews=None, category=None):
+        """
+        Vectorized filter over the numeric and category columns
+
+        Args:
+            min_price (float): Inclusive lower price bound
+            max_price (float): Inclusive upper price bound
+            min_rating (float): Minimum rating.rate
+            min_reviews (int): Minimum rating.count
+            category (str or list): Category name(s) to keep
+
+        Returns:
+            numpy.ndarray: Matching row indices in catalog order
+        """
+        # Missing prices and rates are NaN, which fails every comparison
+        mask = np.ones(len(self), dtype=bool)
+        if min_price is not None:
+            mask &= self.prices >= min_price
+        if max_price is not None:
+            mask &= self.prices <= max_price
+        if min_rating is not None:
+            # Compare in float32 so a threshold like 4.1 matches a stored 4.1
+            mask &= self.rates >= np.float32(min_rating)
+        if min_reviews is not None:
+            mask &= self.counts >= min_reviews
+            if "count" in self._missing:
+                mask &= ~self._missing["count"]
+        if category is not None:
+            wanted = [category] if isinstance(category, str) else list(category)
+            codes = [i for i, name in enumerate(self.categories) if name in wanted]
+            mask &= np.isin(self.category_codes, codes)
+        return np.flatnonzero(mask)
+
+    def iter_dicts(self):
+        """Yield dict views one at a time without building the whole list"""
+        for row in range(len(self)):
+            yield self.to_dict(row)
+
+    def nbytes(self):
+        """Approximate memory held by the store, including string objects"""
+        arrays = (self.ids, self.prices, self.rates, self.counts, self.category_codes,
+                  self._id_order, self._sorted_ids) + tuple(self._missing.values())
+        total = sum(a.nbytes for a in arrays if a is not None)
+        if self._row_of is not None:
+            total += sys.getsizeof(self._row_of) + sum(sys.getsizeof(i) for i in self._row_of)
+        total += sum(column.nbytes for column in (self._titles, self._images, self._descriptions))
+        total += sum(sys.getsizeof(s) for s in self.categories)
+        total += sys.getsizeof(self._extras)
+        return total
@@ -1,28 +1,128 @@
 import google.generativeai as genai
+import io
 import json
 import logging
+import threading
+import time
+from collections import deque
+from utils.image_processor import ImageCache, ImageProcessor
+from .hedging_service import AttemptCancelled
+from .scheduler_service import INTERACTIVE
 
 logger = logging.getLogger(__name__)
 
+# Files uploaded through the File API expire after 48 hours
+UPLOADED_FILE_TTL = 47 * 3600
+
 class GeminiService:
-    def __init__(self, api_key):
+    def __init__(self, api_key, scheduler=None, hedger=None, image_settings=None):
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel('gemini-2.0-flash')
+        self.scheduler = scheduler
+        self.hedger = hedger
+        
+        # Recent single-description calls, used as the baseline for variant cost reports
+        self._single_calls = deque(maxlen=100)
+        self._usage_lock = threading.Lock()
+        
+        # Vision-grounded generation: encoding budget, encoded-image cache and uploads
+        self.image_settings = {
+            "max_pixels": 768 * 768,
+            "max_side": 768,
+            "quality": 80,
+            "format": "JPEG",
+            "upload": False,
+            "cache_dir": None,
+            "url_ttl": 3600,
+        }
+        self.image_settings.update(image_settings or {})
+        self.image_cache = ImageCache(cache_dir=self.image_settings["cache_dir"])
+        self._uploaded_files = {}
+        self._upload_lock = threading.Lock()
     
-    def generate_product_description(self, product_data, category="general"):
-        """Generate comprehensive product description"""
+    def generate_product_description(self, product_data, category="general", priority=INTERACTIVE, hedge=False,
+                                     include_image=False):
+        """Generate comprehensive product description, optionally grounded in the product image"""
         try:
             prompt = self._create_description_prompt(product_data, category)
-            response = self.model.generate_content(prompt)
+            
+            image = None
+            if include_image and product_data.get('image'):
+                image = self._prepare_image(product_data['image'])
+            if image:
+                prompt = [prompt + self._image_instructions(), image["part"]]
+            
+            started = time.monotonic()
+            response = self._generate(prompt, priority, hedge)
+            usage = self._usage(response, time.monotonic() - started)
+            if image is None:
+                with self._usage_lock:
+                    self._single_calls.append(usage)
             
             # Parse the response to extract structured data
-            return self._parse_description_response(response.text)
+            result = self._parse_description_response(response.text)
+            if image:
+                result["image_usage"] = dict(image["report"], prompt_tokens=usage["prompt_tokens"])
+            return result
         
         except Exception as e:
             logger.error(f"Error generating description: {str(e)}")
             raise e
     
-    def optimize_for_seo(self, content, keywords):
+    def generate_description_variants(self, product_data, category="general", count=3, mode="prompt",
+                                      priority=INTERACTIVE, hedge=False):
+        """
+        Generate several alternative descriptions in a single model call
+        
+        Args:
+            product_data (dict): Product to describe
+            category (str): Category passed to the prompt
+            count (int): Number of variants to request
+            mode (str): "prompt" asks for all variants in one structured
+                response; "candidates" samples independent candidates of the
+                regular prompt via candidate_count
+            
+        Returns:
+            dict: {"variants": [...], "usage": {...}} with unranked variants
+        """
+        try:
+            started = time.monotonic()
+            if mode == "candidates":
+                prompt = self._create_description_prompt(product_data, category)
+                response = self._generate(
+                    prompt, priority, hedge,
+                    generation_config=genai.GenerationConfig(candidate_count=count)
+                )
+                variants = [
+                    self._parse_description_response(self._candidate_text(candidate))
+                    for candidate in response.candidates
+                ]
+            elif mode == "prompt":
+                prompt = self._create_variants_prompt(product_data, category, count)
+                response = self._generate(prompt, priority, hedge)
+                parsed = self._parse_json_response(response.text)
+                variants = [v for v in parsed.get('variants', []) if isinstance(v, dict)]
+                if not variants:
+                    # Fall back to treating the whole response as a single variant
+                    variants = [self._parse_description_response(response.text)]
+            else:
+                raise ValueError(f"Unknown variants mode: {mode}")
+            
+            usage = self._usage(response, time.monotonic() - started)
+            single_prompt_tokens = usage["prompt_tokens"]
+            if mode == "prompt" and single_prompt_tokens is not None:
+                # Scale the measured prompt by length to the single-description prompt
+                single_prompt = self._create_description_prompt(product_data, category)
+                single_prompt_tokens = single_prompt_tokens * len(single_prompt) / max(1, len(prompt))
+            variants = variants[:count]
+            report = self._variant_usage_report(usage, len(variants), single_prompt_tokens)
+            return {"variants": variants, "usage": report}
+        
+        except Exception as e:
+            logger.error(f"Error generating description variants: {str(e)}")
+            raise e
+    
+    def optimize_for_seo(self, content, keywords, priority=INTERACTIVE, hedge=False):
         """Optimize content for SEO"""
         try:
             prompt = f"""
@@ -40,13 +140,33 @@ class GeminiService:
             Format as JSON with keys: seo_title, meta_description, optimized_description, alt_text
             """
             
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt, priority, hedge)
             return self._parse_json_response(response.text)
         
         except Exception as e:
             logger.error(f"Error optimizing SEO: {str(e)}")
             raise e
     
+    def _generate(self, prompt, priority, hedge=False, **generate_kwargs):
+        """Call the model, queueing behind the scheduler and hedging when configured"""
+        def attempt(handle=None):
+            def upstream():
+                # A hedge attempt that lost while queued gives its slot back unused
+                if handle is not None and not handle.start():
+                    raise AttemptCancelled()
+                response = self.model.generate_content(prompt, **generate_kwargs)
+                if handle is not None:
+                    handle.succeeded()
+                return response
+            
+            if self.scheduler is None:
+                return upstream()
+            return self.scheduler.run(priority, upstream)
+        
+        if hedge and self.hedger is not None:
+            return self.hedger.call(attempt)
+        return attempt()
+    
     def _create_description_prompt(self, product_data, category):
         """Create prompt for product description generation"""
         return f"""
@@ -73,6 +193,152 @@ class GeminiService:
         Make it engaging, informative, and optimized for e-commerce conversion.
         """
     
+    def _prepare_image(self, image_url):
+        """Encode the product image within the pixel budget and build the prompt part"""
+        settings = self.image_settings
+        encoded = ImageProcessor.encode_for_model(
+            image_url,
+            self.image_cache,
+            max_pixels=settings["max_pixels"],
+            max_side=settings["max_side"],
+            quality=settings["quality"],
+            image_format=settings["format"],
+            url_ttl=settings["url_ttl"]
+        )
+        if encoded is None:
+            return None
+        
+        report = {
+            "content_hash": encoded["content_hash"],
+            "size": list(encoded["size"]),
+            "bytes": encoded["bytes"],
+            "source_bytes": encoded["source_bytes"],
+            "estimated_image_tokens": encoded["estimated_tokens"],
+            "cache_hit": encoded["cache_hit"],
+            "uploaded": False,
+        }
+        
+        if settings["upload"]:
+            part, reused = self._uploaded_file(encoded)
+            report["uploaded"] = True
+            report["upload_reused"] = reused
+        else:
+            part = {"mime_type": encoded["mime_type"], "data": encoded["data"]}
+        return {"part": part, "report": report}
+    
+    def _uploaded_file(self, encoded):
+        """Upload an encoded image once per content hash and reuse the file handle"""
+        key = (encoded["content_hash"], encoded["mime_type"], encoded["bytes"])
+        with self._upload_lock:
+            cached = self._uploaded_files.get(key)
+            if cached and time.time() - cached[1] < UPLOADED_FILE_TTL:
+                return cached[0], True
+        
+        uploaded = genai.upload_file(io.BytesIO(encoded["data"]), mime_type=encoded["mime_type"])
+        with self._upload_lock:
+            self._uploaded_files[key] = (uploaded, time.time())
+        return uploaded, False
+    
+    def _image_instructions(self):
+        """Extra prompt text when the product image is attached"""
+        return """
+        The product image is attached. Ground the description and key features in what is
+        actually visible (materials, colours, shape, details) and add an "alt_text" key with
+        concise, descriptive alt text for the image.
+        """
+    
+    def _create_variants_prompt(self, product_data, category, count):
+        """Create prompt asking for several distinct descriptions in one response"""
+        return f"""
+        Write {count} distinct alternative e-commerce product descriptions for the following product.
+        Give each variant a different angle or tone (for example benefit-led, technical, lifestyle),
+        and avoid reusing sentences between variants.
+        
+        Product Information:
+        - Title: {product_data.get('title', 'N/A')}
+        - Category: {category}
+        - Price: ${product_data.get('price', 'N/A')}
+        - Current Description: {product_data.get('description', 'N/A')}
+        - Image URL: {product_data.get('image', 'N/A')}
+        - Rating: {product_data.get('rating', {}).get('rate', 'N/A')} ({product_data.get('rating', {}).get('count', 'N/A')} reviews)
+        
+        Each variant must contain:
+        1. SEO-optimized product title (compelling and keyword-rich)
+        2. Detailed product description (3-4 paragraphs)
+        3. Key features (5-7 bullet points)
+        4. Technical specifications (if applicable)
+        5. Suggested keywords for SEO
+        
+        Format the response as JSON: {{"variants": [...]}} where each variant has keys:
+        seo_title, description, features, specifications, keywords
+        """
+    
+    @staticmethod
+    def _candidate_text(candidate):
+        """Concatenate the text parts of one response candidate"""
+        return "".join(getattr(part, 'text', '') for part in candidate.content.parts)
+    
+    @staticmethod
+    def _usage(response, latency):
+        """Token counts and latency of one model call"""
+        metadata = getattr(response, 'usage_metadata', None)
+        return {
+            "latency_ms": round(latency * 1000, 1),
+            "prompt_tokens": getattr(metadata, 'prompt_token_count', None),
+            "output_tokens": getattr(metadata, 'candidates_token_count', None),
+        }
+    
+    def _variant_usage_report(self, usage, count, single_prompt_tokens=None):
+        """
+        Per-variant cost of a variants call next to the cost of N single calls
+
+        The single-call baseline is the mean of recent single-description
+        calls made by this service. Until there are any, it is estimated
+        from single_prompt_tokens (the token count of the regular
+        description prompt) and this call's output tokens per variant.
+        """
+        def per_variant(value):
+            return round(value / count, 1) if value is not None and count else None
+        
+        report = {
+            "calls": 1,
+            "variants": count,
+            "total": usage,
+            "per_variant": {key: per_variant(value) for key, value in usage.items()},
+            "separate_calls_estimate": None,
+        }
+        
+        with self._usage_lock:
+            history = list(self._single_calls)
+        if history:
+            # Baseline from recent single-description calls made by this service
+            def mean(key):
+                values = [h[key] for h in history if h[key] is not None]
+                return sum(values) / len(values) if values else None
+            
+            estimate = {key: mean(key) for key in usage}
+            source = "sampled"
+        elif single_prompt_tokens is not None and count:
+            estimate = {
+                "latency_ms": None,
+                "prompt_tokens": single_prompt_tokens,
+                "output_tokens": usage["output_tokens"] / count if usage["output_tokens"] is not None else None,
+            }
+            source = "estimated"
+        else:
+            return report
+        
+        report["separate_calls_estimate"] = {
+            "calls": count,
+            "source": source,
+            "sampled_calls": len(history),
+            "total": {key: round(value * count, 1) if value is not None else None
+                      for key, value in estimate.items()},
+            "per_variant": {key: round(value, 1) if value is not None else None
+                            for key, value in estimate.items()},
+        }
+        return report
+    
     def _parse_description_response(self, response_text):
         """Parse and clean the response from Gemini"""
         try:
@@ -0,0 +1,228 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+
+class AttemptCancelled(Exception):
+    """Raised by a hedged call whose attempt lost the race before reaching upstream"""
+
+
+class _Attempt:
+    """One copy of a hedged call, handed to the wrapped function as its handle"""
+
+    __slots__ = ("group", "started", "started_at", "finished_at", "cancelled", "skipped")
+
+    def __init__(self, group):
+        self.group = group
+        self.started = threading.Event()
+        self.started_at = None
+        self.finished_at = None
+        self.cancelled = threading.Event()
+        self.skipped = False
+        group.append(self)
+
+    def start(self):
+        """Record the upstream send; returns False if the attempt is no longer wanted"""
+        if self.cancelled.is_set():
+            self.skipped = True
+            return False
+        if not self.started.is_set():
+            self.started_at = time.monotonic()
+            self.started.set()
+        return True
+
+    def succeeded(self):
+        """Tell the other copies of this call that the race is over"""
+        for other in self.group:
+            if other is not self:
+                other.cancelled.set()
+
+
+class RequestHedger:
+    """
+    Issues a backup copy of slow upstream calls to cut tail latency
+
+    Latency of completed calls is tracked in a sliding window. When a call
+    has not returned by the tracked percentile, an identical second request
+    is sent and whichever finishes first wins. Hedges are paid for out of a
+    budget that grows by max_extra_fraction per call, so at most that share
+    of extra requests is ever issued (plus a small burst allowance).
+    """
+
+    BUDGET_BURST = 5.0
+
+    def __init__(self, percentile=0.95, max_extra_fraction=0.05, initial_delay=2.0,
+                 min_delay=0.05, window=500, min_samples=20, max_workers=16):
+        """
+        Args:
+            percentile (float): Latency quantile after which a hedge is sent
+            max_extra_fraction (float): Upper bound on hedges per call
+            initial_delay (float): Hedge delay in seconds until enough samples exist
+            min_delay (float): Lower bound on the hedge delay in seconds
+            window (int): Number of recent latencies the percentile is taken over
+            min_samples (int): Samples needed before the percentile is trusted
+            max_workers (int): Threads available for primary and hedge attempts
+        """
+        self.percentile = percentile
+        self.max_extra_fraction = max_extra_fraction
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._budget = 1.0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+
+        self._calls = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._budget_denied = 0
+        self._skipped_upstream = 0
+        self._effective = deque(maxlen=window)
+        self._unhedged = deque(maxlen=window)
+
+    def call(self, func):
+        """
+        Run func with hedging
+
+        Args:
+            func (callable): Takes an attempt handle and returns the upstream
+                response. It must call handle.start() right before the upstream
+                request is sent (after any queueing); if that returns False the
+                other copy already won, and func should raise AttemptCancelled
+                without sending. It should call handle.succeeded() as soon as
+                the response arrives, before giving up any scheduler slot, so
+                a copy queued behind it is stopped in time
+
+        Returns:
+            The result of whichever attempt succeeds first
+        """
+        with self._lock:
+            self._calls += 1
+            self._budget = min(self._budget + self.max_extra_fraction, self.BUDGET_BURST)
+
+        group = []
+        primary = _Attempt(group)
+        primary_future = self._pool.submit(self._run, func, primary)
+
+        # Hedge delay is measured from the moment the primary reaches upstream,
+        # so time spent queued behind the scheduler does not trigger a hedge
+        primary.started.wait()
+        remaining = self.current_delay() - (time.monotonic() - primary.started_at)
+        wait([primary_future], timeout=max(0.0, remaining))
+        if primary_future.done() or not self._take_budget():
+            return self._finish(primary, primary_future, primary, [primary_future])
+
+        hedge = _Attempt(group)
+        hedge_future = self._pool.submit(self._run, func, hedge)
+        with self._lock:
+            self._hedges += 1
+
+        pending = {primary_future: primary, hedge_future: hedge}
+        errors = []
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                if future.exception() is None:
+                    # Stop the loser before it reaches upstream: drop it from the pool
+                    # queue, or have it skip the request once it leaves the scheduler.
+                    # A request already in flight cannot be interrupted and is ignored.
+                    for other in pending:
+                        other.cancel()
+                        pending[other].cancelled.set()
+                    if future is hedge_future:
+                        with self._lock:
+                            self._hedge_wins += 1
+                    return self._finish(primary, future, hedge if future is hedge_future else primary,
+                                        [primary_future, hedge_future])
+                errors.append(future.exception())
+        raise errors[0]
+
+    def _run(self, func, attempt):
+        try:
+            return func(attempt)
+        finally:
+            attempt.finished_at = time.monotonic()
+            if attempt.skipped:
+                with self._lock:
+                    self._skipped_upstream += 1
+            else:
+                if not attempt.started.is_set():
+                    # Failed before reaching upstream; unblock the waiter in call()
+                    attempt.started_at = attempt.finished_at
+                    attempt.started.set()
+                with self._lock:
+                    self._latencies.append(attempt.finished_at - attempt.started_at)
+
+    def _finish(self, primary, future, winner, futures):
+        result = future.result()
+        effective = winner.finished_at - primary.started_at
+        with self._lock:
+            self._effective.append(effective)
+
+        # What the caller would have waited without hedging, once the primary completes
+        primary_future = futures[0]
+        if primary_future.done():
+            self._record_unhedged(primary)
+        else:
+            primary_future.add_done_callback(lambda _: self._record_unhedged(primary))
+        return result
+
+    def _record_unhedged(self, primary):
+        if primary.finished_at is None:
+            return
+        with self._lock:
+            self._unhedged.append(primary.finished_at - primary.started_at)
+
+    def _take_budget(self):
+        with self._lock:
+            if self._budget >= 1.0:
+                self._budget -= 1.0
+                return True
+            self._budget_denied += 1
+            return False
+
+    def current_delay(self):
+        """Seconds to wait before hedging, from the tracked latency percentile"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_delay
+            samples = sorted(self._latencies)
+        index = min(len(samples) - 1, int(self.percentile * len(samples)))
+        return max(self.min_delay, samples[index])
+
+    def stats(self):
+        """Hedge rate and latency percentiles with and without hedging"""
+        with self._lock:
+            effective = sorted(self._effective)
+            unhedged = sorted(self._unhedged)
+            calls, hedges = self._calls, self._hedges
+            stats = {
+                "calls": calls,
+                "hedges": hedges,
+                "hedge_rate": round(hedges / calls, 4) if calls else 0.0,
+                "hedge_wins": self._hedge_wins,
+                "budget_denied": self._budget_denied,
+                "losers_skipped_upstream": self._skipped_upstream,
+                "max_extra_fraction": self.max_extra_fraction,
+            }
+        stats["hedge_delay_ms"] = round(self.current_delay() * 1000, 1)
+        stats["latency_ms"] = {
+            "hedged": self._percentiles(effective),
+            "primary_only": self._percentiles(unhedged),
+        }
+        return stats
+
+    @staticmethod
+    def _percentiles(samples):
+        if not samples:
+            return None
+        def pick(q):
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 1)
+        return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
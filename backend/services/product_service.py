@@ -1,37 +1,66 @@
 import requests
+import hashlib
 import logging
 from config import Config
+from .catalog_store import CatalogStore
 
 logger = logging.getLogger(__name__)
 
 class ProductService:
     def __init__(self):
         self.api_url = Config.DEMO_STORE_API_URL  # Points to GitHub raw JSON
+        self.catalog = None  # Last fetched catalog as a CatalogStore
+        self.using_sample_data = False  # True while the catalog is the offline fallback
+        self.catalog_version = None  # Hash of the response the catalog was built from
 
-    def fetch_products(self):
-        """Fetch products from GitHub JSON"""
+    def fetch_catalog(self):
+        """Fetch products from GitHub JSON into a compact CatalogStore"""
         try:
             response = requests.get(self.api_url)
             response.raise_for_status()
+            
+            # Unchanged upstream data: reuse the catalog instead of rebuilding it
+            version = hashlib.sha1(response.content).hexdigest()
+            if version == self.catalog_version and self.catalog is not None:
+                return self.catalog
             data = response.json()
             
             # If JSON is a dictionary with a key 'products', use it
             if isinstance(data, dict) and "products" in data:
-                return data["products"]
-            return data  # Otherwise, assume JSON is a list of products
+                data = data["products"]
+            # Otherwise, assume JSON is a list of products
         
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching products: {str(e)}")
-            return self._get_sample_products()
+            # Keep serving the last real catalog rather than replacing it with samples
+            if self.catalog is not None and not self.using_sample_data:
+                return self.catalog
+            self.catalog = CatalogStore.from_products(self._get_sample_products())
+            self.using_sample_data = True
+            self.catalog_version = None
+            return self.catalog
+        
+        self.catalog = CatalogStore.from_products(data)
+        self.using_sample_data = False
+        self.catalog_version = version
+        return self.catalog
+
+    def fetch_products(self):
+        """Fetch products from GitHub JSON as a list of dicts"""
+        return self.fetch_catalog().to_dicts()
+
+    def filter_products(self, **filters):
+        """Filter the cached catalog on price, rating and category; see CatalogStore.filter"""
+        catalog = self.catalog or self.fetch_catalog()
+        return catalog.to_dicts(catalog.filter(**filters))
 
     def fetch_product_by_id(self, product_id):
-        """Fetch single product by ID from the JSON"""
-        products = self.fetch_products()
-        for product in products:
-            if product.get("id") == product_id:
-                return product
-        logger.warning(f"Product with ID {product_id} not found")
-        return None
+        """Fetch single product by ID from the cached catalog"""
+        catalog = self.catalog or self.fetch_catalog()
+        product = catalog.get(product_id)
+        if product is None:
+            logger.warning(f"Product with ID {product_id} not found")
+        return product
 
     def _get_sample_products(self):
         """Return sample products if API fails"""
@@ -0,0 +1,209 @@
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+BACKGROUND = "background"
+PRIORITY_CLASSES = (INTERACTIVE, BATCH, BACKGROUND)
+
+
+class _Ticket:
+    __slots__ = ("priority", "enqueued_at", "granted")
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+
+
+class GenerationScheduler:
+    """
+    Priority-aware admission control for upstream Gemini calls
+
+    Callers are queued per priority class and admitted with weighted fair
+    sharing of the concurrency and rate budget, so under saturation each
+    backlogged class gets slots in proportion to its weight. Interactive
+    requests additionally get a reserved share of the concurrency slots
+    that batch and background work may never occupy, so a user request
+    waits at most for one of those to free up even behind a bulk run.
+    """
+
+    LATENCY_SAMPLES = 2000
+
+    def __init__(self, max_concurrency=8, requests_per_minute=0, weights=None, interactive_reserved=2):
+        """
+        Args:
+            max_concurrency (int): Maximum upstream calls in flight
+            requests_per_minute (float): Upstream rate budget, 0 for unlimited
+            weights (dict): Positive fair-share weight per priority class
+            interactive_reserved (int): Slots batch/background work may never occupy
+        """
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.requests_per_minute = float(requests_per_minute or 0)
+        self.weights = {INTERACTIVE: 8, BATCH: 3, BACKGROUND: 1}
+        self.weights.update(weights or {})
+        for name, weight in self.weights.items():
+            if name not in PRIORITY_CLASSES:
+                raise ValueError(f"Unknown priority class in weights: {name}")
+            if not isinstance(weight, (int, float)) or isinstance(weight, bool) or not weight > 0:
+                raise ValueError(f"Weight for {name} must be a positive number, got {weight!r}")
+        self.interactive_reserved = min(max(0, int(interactive_reserved)), self.max_concurrency - 1)
+
+        self._cond = threading.Condition()
+        self._queues = {name: deque() for name in PRIORITY_CLASSES}
+        self._virtual_time = {name: 0.0 for name in PRIORITY_CLASSES}
+        self._in_flight = {name: 0 for name in PRIORITY_CLASSES}
+        self._wait_samples = {name: deque(maxlen=self.LATENCY_SAMPLES) for name in PRIORITY_CLASSES}
+        self._completed = {name: 0 for name in PRIORITY_CLASSES}
+        self._clock = 0.0
+
+        # Token bucket for the rate budget, allowing bursts of up to one second's worth
+        self._tokens = max(1.0, self.requests_per_minute / 60.0)
+        self._last_refill = time.monotonic()
+
+    def run(self, priority, func, *args, **kwargs):
+        """
+        Run func once a slot for the given priority class is granted
+
+        Args:
+            priority (str): One of interactive, batch or background
+
+        Returns:
+            Whatever func returns
+        """
+        self.acquire(priority)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.release(priority)
+
+    def acquire(self, priority):
+        """Block until the caller is admitted; returns the seconds spent queued"""
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        ticket = _Ticket(priority)
+        with self._cond:
+            queue = self._queues[priority]
+            if not queue:
+                # A class returning from idle must not cash in credit accumulated while empty
+                self._virtual_time[priority] = max(self._virtual_time[priority], self._clock)
+            queue.append(ticket)
+            self._dispatch()
+            while not ticket.granted:
+                self._cond.wait(timeout=self._next_token_in())
+                self._dispatch()
+
+        waited = time.monotonic() - ticket.enqueued_at
+        with self._cond:
+            self._wait_samples[priority].append(waited)
+        return waited
+
+    def release(self, priority):
+        """Return a slot after the upstream call finishes"""
+        with self._cond:
+            self._in_flight[priority] -= 1
+            self._completed[priority] += 1
+            self._dispatch()
+            self._cond.notify_all()
+
+    def _dispatch(self):
+        """Grant slots to queued tickets; caller must hold the condition lock"""
+        granted = False
+        while True:
+            if sum(self._in_flight.values()) >= self.max_concurrency:
+                break
+            if not self._take_token():
+                break
+            priority = self._pick_class()
+            if priority is None:
+                self._tokens += 1
+                break
+            ticket = self._queues[priority].popleft()
+            ticket.granted = True
+            self._in_flight[priority] += 1
+            self._clock = self._virtual_time[priority]
+            self._virtual_time[priority] += 1.0 / self.weights[priority]
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _pick_class(self):
+        """Choose the next class by weighted fair queueing on virtual time"""
+        waiting = [name for name in PRIORITY_CLASSES if self._queues[name]]
+        if not waiting:
+            return None
+
+        bulk_in_flight = sum(n for name, n in self._in_flight.items() if name != INTERACTIVE)
+        eligible = []
+        for name in waiting:
+            # Bulk work never occupies the slots reserved for interactive traffic;
+            # outside those, the classes share by weight
+            if name != INTERACTIVE and bulk_in_flight >= self.max_concurrency - self.interactive_reserved:
+                continue
+            eligible.append(name)
+        if not eligible:
+            return None
+        return min(eligible, key=lambda name: self._virtual_time[name])
+
+    def _refill(self):
+        if not self.requests_per_minute:
+            return
+        now = time.monotonic()
+        rate = self.requests_per_minute / 60.0
+        self._tokens = min(max(1.0, rate), self._tokens + (now - self._last_refill) * rate)
+        self._last_refill = now
+
+    def _take_token(self):
+        if not self.requests_per_minute:
+            return True
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def _next_token_in(self):
+        """Seconds until the rate budget admits another call, or None to wait for a release"""
+        if not self.requests_per_minute:
+            return None
+        self._refill()
+        if self._tokens >= 1:
+            return 0.05
+        return (1 - self._tokens) / (self.requests_per_minute / 60.0)
+
+    def stats(self):
+        """Per-class queueing latency percentiles and current load"""
+        with self._cond:
+            classes = {}
+            for name in PRIORITY_CLASSES:
+                samples = sorted(self._wait_samples[name])
+                classes[name] = {
+                    "weight": self.weights.get(name, 1),
+                    "queued": len(self._queues[name]),
+                    "in_flight": self._in_flight[name],
+                    "completed": self._completed[name],
+                    "queue_wait_ms": {
+                        "p50": self._percentile(samples, 0.50),
+                        "p95": self._percentile(samples, 0.95),
+                        "p99": self._percentile(samples, 0.99),
+                        "max": round(samples[-1] * 1000, 2) if samples else None,
+                    },
+                }
+            return {
+                "max_concurrency": self.max_concurrency,
+                "requests_per_minute": self.requests_per_minute or None,
+                "interactive_reserved": self.interactive_reserved,
+                "classes": classes,
+            }
+
+    @staticmethod
+    def _percentile(sorted_samples, fraction):
+        if not sorted_samples:
+            return None
+        index = min(len(sorted_samples) - 1, int(round(fraction * (len(sorted_samples) - 1))))
+        return round(sorted_samples[index] * 1000, 2)
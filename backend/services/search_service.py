@@ -0,0 +1,697 @@
+import bisect
+import heapq
+import hashlib
+import logging
+import math
+import os
+import pickle
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in",
+    "is", "it", "of", "on", "or", "that", "the", "this", "to", "with", "your"
+])
+
+
+def tokenize(text):
+    """Split text into lowercase alphanumeric tokens, dropping stop words"""
+    if not text:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = " ".join(str(item) for item in text)
+    return [t for t in TOKEN_PATTERN.findall(str(text).lower()) if t not in STOP_WORDS]
+
+
+def _deletes(term):
+    """All strings reachable from term by deleting one character"""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a, b):
+    """True if a and b differ by at most one insert, delete, substitute or transpose"""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diff = [i for i in range(la) if a[i] != b[i]]
+        if len(diff) == 1:
+            return True
+        return (len(diff) == 2 and diff[1] == diff[0] + 1
+                and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+    if la > lb:
+        a, b = b, a
+    # b is exactly one character longer than a
+    for i in range(len(a)):
+        if a[i] != b[i]:
+            return a[i:] == b[i + 1:]
+    return True
+
+
+class SearchIndex:
+    """
+    In-process inverted index with BM25 ranking over catalog and generated content
+
+    Postings are kept in dicts for cheap incremental updates. For querying,
+    each document also has a dense slot number, and the postings of a term
+    are materialized on first use as NumPy arrays of slots and BM25 impacts
+    sorted by impact. Scoring, facet counting and top-k selection then run
+    vectorized, and a single-term query reads only the first offset+limit
+    entries of its impact-ordered list.
+    """
+
+    FORMAT_VERSION = 2
+
+    # Per-field term frequency multipliers (BM25F-style weighting)
+    FIELD_WEIGHTS = {
+        "title": 3.0,
+        "category": 2.0,
+        "keywords": 2.0,
+        "features": 1.0,
+        "description": 1.0,
+    }
+    CATALOG_FIELDS = ("title", "description", "category")
+    GENERATED_FIELDS = ("keywords", "features")
+
+    K1 = 1.2
+    B = 0.75
+    PREFIX_EXPANSIONS = 30
+    PREFIX_WEIGHT = 0.8
+    FUZZY_WEIGHT = 0.6
+    FUZZY_MIN_LENGTH = 4
+    NORM_DRIFT = 0.01
+    TERM_CACHE_POSTINGS = 5_000_000
+    WARM_TERM_FRACTION = 0.01
+
+    def __init__(self, index_path=None):
+        self.index_path = index_path
+        self._lock = threading.RLock()
+        self._reset()
+        self._dirty = False
+        self._last_save = 0.0
+        self._save_lock = threading.Lock()      # one writer at a time
+        self._save_thread = None
+
+        if index_path and os.path.exists(index_path):
+            self.load(index_path)
+
+    def _reset(self):
+        self._postings = defaultdict(dict)      # term -> {doc_id: weighted tf}
+        self._doc_terms = {}                    # doc_id -> {term: weighted tf}
+        self._doc_len = {}                      # doc_id -> weighted document length
+        self._total_len = 0.0
+        self._docs = {}                         # doc_id -> stored display fields
+        self._catalog_hash = {}                 # doc_id -> fingerprint of catalog fields
+        self._generated = {}                    # doc_id -> {"keywords": [...], "features": [...]}
+        self._categories = defaultdict(set)     # category -> {doc_id}
+        self._sorted_terms = []                 # for prefix lookups
+        self._delete_index = defaultdict(set)   # one-deletion variant -> {term}
+        self._norms = None                      # slot -> BM25 length norm, rebuilt lazily
+        self._norm_avg_len = 0.0                # average length the cached norms assume
+        self._catalog_version = None            # version of the last fully synced catalog
+
+        # Dense per-document columns used for vectorized scoring
+        self._slot_of = {}                      # doc_id -> slot
+        self._slot_ids = []                     # slot -> doc_id (None if free)
+        self._free_slots = []
+        self._slot_len = np.zeros(0, dtype=np.float64)
+        self._slot_category = np.zeros(0, dtype=np.int32)
+        self._category_codes = {}               # category -> code
+        self._category_names = []               # code -> category
+        self._term_cache = {}                   # term -> (slots, impacts), impact-ordered
+        self._term_cache_size = 0
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def sync_catalog(self, products, version=None):
+        """
+        Bring the index in line with a freshly fetched catalog
+
+        Only products whose indexed fields changed are re-tokenized, and
+        products missing from the catalog are dropped. Generated content of a
+        dropped product is kept so it is indexed again if the product returns.
+
+        Args:
+            products (list): Product dicts as returned by ProductService
+            version (str): Catalog version; syncing the same version twice is a no-op
+
+        Returns:
+            dict: Counts of added, updated and removed documents
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0}
+        with self._lock:
+            if version is not None and version == self._catalog_version:
+                return stats
+            seen = set()
+            for product in products:
+                doc_id = product.get("id")
+                if doc_id is None:
+                    continue
+                seen.add(doc_id)
+                result = self._upsert_catalog(doc_id, product)
+                if result:
+                    stats[result] += 1
+
+            for doc_id in [d for d in self._catalog_hash if d not in seen]:
+                self._remove(doc_id, keep_generated=True)
+                stats["removed"] += 1
+
+            if any(stats.values()) or version != self._catalog_version:
+                self._dirty = True
+            self._catalog_version = version
+            self._length_norms()
+            self._warm_term_cache()
+        return stats
+
+    def upsert_product(self, product):
+        """Add or refresh a single catalog product"""
+        doc_id = product.get("id")
+        if doc_id is None:
+            return None
+        with self._lock:
+            result = self._upsert_catalog(doc_id, product)
+            if result:
+                # The index no longer mirrors the synced catalog exactly
+                self._catalog_version = None
+                self._dirty = True
+            return result
+
+    def add_generated_content(self, product_id, content):
+        """
+        Index generated keywords and features for a product
+
+        Args:
+            product_id: ID of the product the content was generated for
+            content (dict): Generation result with optional keywords/features
+        """
+        if product_id is None or not isinstance(content, dict):
+            return
+        generated = {
+            field: [str(v) for v in (content.get(field) or []) if v]
+            for field in self.GENERATED_FIELDS
+        }
+        with self._lock:
+            if self._generated.get(product_id) == generated:
+                return
+            self._generated[product_id] = generated
+            if product_id in self._docs:
+                self._index_document(product_id)
+            self._dirty = True
+
+    def remove_product(self, product_id):
+        """Drop a product and its generated content from the index"""
+        with self._lock:
+            if product_id in self._docs:
+                self._remove(product_id)
+                self._dirty = True
+
+    def _upsert_catalog(self, doc_id, product):
+        fingerprint = self._fingerprint(product)
+        if self._catalog_hash.get(doc_id) == fingerprint:
+            return None
+        existed = doc_id in self._catalog_hash
+        self._catalog_hash[doc_id] = fingerprint
+        self._docs[doc_id] = {
+            "id": doc_id,
+            "title": product.get("title", ""),
+            "description": product.get("description", ""),
+            "category": product.get("category", ""),
+        }
+        self._index_document(doc_id)
+        return "updated" if existed else "added"
+
+    def _fingerprint(self, product):
+        raw = "\x1f".join(str(product.get(field, "")) for field in self.CATALOG_FIELDS)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _index_document(self, doc_id):
+        """(Re)build postings for one document from its catalog and generated fields"""
+        self._unindex_terms(doc_id)
+
+        doc = self._docs[doc_id]
+        generated = self._generated.get(doc_id, {})
+        terms = Counter()
+        for field, weight in self.FIELD_WEIGHTS.items():
+            value = generated.get(field) if field in self.GENERATED_FIELDS else doc.get(field)
+            for token in tokenize(value):
+                terms[token] += weight
+
+        for term, tf in terms.items():
+            if term not in self._postings:
+                self._add_term(term)
+            self._postings[term][doc_id] = tf
+            self._invalidate_term(term)
+
+        length = sum(terms.values())
+        # A plain dict pickles without allocating, unlike a Counter
+        self._doc_terms[doc_id] = dict(terms)
+        self._doc_len[doc_id] = length
+        self._total_len += length
+
+        category = doc.get("category")
+        if category:
+            self._categories[category].add(doc_id)
+
+        slot = self._assign_slot(doc_id)
+        self._slot_len[slot] = length
+        self._slot_category[slot] = self._category_code(category) if category else -1
+        self._refresh_norm(doc_id)
+
+    def _unindex_terms(self, doc_id):
+        old_terms = self._doc_terms.pop(doc_id, None)
+        if old_terms is None:
+            return
+        for term in old_terms:
+            self._invalidate_term(term)
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                self._drop_term(term)
+        self._total_len -= self._doc_len.pop(doc_id, 0.0)
+
+        for category, members in list(self._categories.items()):
+            members.discard(doc_id)
+            if not members:
+                del self._categories[category]
+
+    def _remove(self, doc_id, keep_generated=False):
+        self._unindex_terms(doc_id)
+        self._docs.pop(doc_id, None)
+        self._catalog_hash.pop(doc_id, None)
+        if not keep_generated:
+            self._generated.pop(doc_id, None)
+        slot = self._slot_of.pop(doc_id, None)
+        if slot is not None:
+            self._slot_ids[slot] = None
+            self._slot_len[slot] = 0.0
+            self._slot_category[slot] = -1
+            self._free_slots.append(slot)
+
+    def _assign_slot(self, doc_id):
+        slot = self._slot_of.get(doc_id)
+        if slot is not None:
+            return slot
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slot_ids[slot] = doc_id
+        else:
+            slot = len(self._slot_ids)
+            self._slot_ids.append(doc_id)
+            self._grow(slot + 1)
+        self._slot_of[doc_id] = slot
+        return slot
+
+    def _grow(self, size):
+        """Extend the dense columns geometrically to hold at least size slots"""
+        capacity = len(self._slot_len)
+        if size <= capacity:
+            return
+        extra = max(size, 2 * capacity, 1024) - capacity
+        self._slot_len = np.concatenate([self._slot_len, np.zeros(extra)])
+        self._slot_category = np.concatenate([self._slot_category, np.full(extra, -1, dtype=np.int32)])
+        if self._norms is not None:
+            self._norms = np.concatenate([self._norms, np.zeros(extra)])
+
+    def _category_code(self, category):
+        code = self._category_codes.get(category)
+        if code is None:
+            code = self._category_codes[category] = len(self._category_names)
+            self._category_names.append(category)
+        return code
+
+    def _rebuild_postings(self):
+        """Recreate postings, lengths, categories and term lookups from the per-document terms"""
+        for doc_id, terms in self._doc_terms.items():
+            for term, tf in terms.items():
+                self._postings[term][doc_id] = tf
+            length = sum(terms.values())
+            self._doc_len[doc_id] = length
+            self._total_len += length
+            category = self._docs.get(doc_id, {}).get("category")
+            if category:
+                self._categories[category].add(doc_id)
+        self._sorted_terms = sorted(self._postings)
+        for term in self._sorted_terms:
+            if len(term) >= self.FUZZY_MIN_LENGTH:
+                for variant in _deletes(term):
+                    self._delete_index[variant].add(term)
+
+    def _rebuild_slots(self):
+        """Recreate the dense columns from the document dicts, e.g. after loading"""
+        self._slot_of, self._slot_ids, self._free_slots = {}, [], []
+        self._slot_len = np.zeros(0, dtype=np.float64)
+        self._slot_category = np.zeros(0, dtype=np.int32)
+        self._category_codes, self._category_names = {}, []
+        self._grow(len(self._docs))
+        for doc_id, doc in self._docs.items():
+            slot = self._assign_slot(doc_id)
+            self._slot_len[slot] = self._doc_len.get(doc_id, 0.0)
+            category = doc.get("category")
+            self._slot_category[slot] = self._category_code(category) if category else -1
+        self._norms = None
+        self._clear_term_cache()
+
+    def _invalidate_term(self, term):
+        cached = self._term_cache.pop(term, None)
+        if cached is not None:
+            self._term_cache_size -= len(cached[0])
+
+    def _clear_term_cache(self):
+        self._term_cache = {}
+        self._term_cache_size = 0
+
+    def _warm_term_cache(self):
+        """Materialize the arrays of common terms up front, so first queries on them stay fast"""
+        threshold = max(1, int(len(self._docs) * self.WARM_TERM_FRACTION))
+        for term, postings in self._postings.items():
+            if len(postings) >= threshold and term not in self._term_cache:
+                self._term_arrays(term)
+
+    def _term_arrays(self, term):
+        """Slots and BM25 impacts tf / (tf + norm) of a term, in descending impact order"""
+        cached = self._term_cache.get(term)
+        if cached is not None:
+            return cached
+
+        postings = self._postings[term]
+        count = len(postings)
+        slots = np.fromiter((self._slot_of[doc_id] for doc_id in postings), dtype=np.int64, count=count)
+        tfs = np.fromiter(postings.values(), dtype=np.float64, count=count)
+        impacts = tfs / (tfs + self._norms[slots])
+        order = np.lexsort((slots, -impacts))
+        cached = (slots[order], impacts[order])
+
+        if self._term_cache_size + count > self.TERM_CACHE_POSTINGS:
+            self._clear_term_cache()
+        self._term_cache[term] = cached
+        self._term_cache_size += count
+        return cached
+
+    def _add_term(self, term):
+        bisect.insort(self._sorted_terms, term)
+        if len(term) >= self.FUZZY_MIN_LENGTH:
+            for variant in _deletes(term):
+                self._delete_index[variant].add(term)
+
+    def _drop_term(self, term):
+        idx = bisect.bisect_left(self._sorted_terms, term)
+        if idx < len(self._sorted_terms) and self._sorted_terms[idx] == term:
+            del self._sorted_terms[idx]
+        if len(term) >= self.FUZZY_MIN_LENGTH:
+            for variant in _deletes(term):
+                bucket = self._delete_index.get(variant)
+                if bucket is not None:
+                    bucket.discard(term)
+                    if not bucket:
+                        del self._delete_index[variant]
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def search(self, query, category=None, limit=20, offset=0):
+        """
+        Rank products against a free-text query
+
+        Args:
+            query (str): Search text; the last token is matched as a prefix
+                and tokens with no exact match fall back to one-edit typos
+            category (str): Optional category facet to filter on
+            limit (int): Maximum number of hits to return
+            offset (int): Number of ranked hits to skip
+
+        Returns:
+            dict: Ranked hits, total match count and category facet counts
+        """
+        started = time.perf_counter()
+        tokens = tokenize(query)
+        limit, offset = max(0, int(limit)), max(0, int(offset))
+        k = offset + limit
+
+        with self._lock:
+            n_docs = len(self._doc_len)
+            norms = self._length_norms()
+            k1_plus_one = self.K1 + 1
+
+            # One group per query token: the (weight, slots, impacts) of each term it expands to
+            groups = []
+            for position, token in enumerate(tokens):
+                is_last = position == len(tokens) - 1
+                group = []
+                for term, boost in self._expand(token, prefix=is_last):
+                    slots, impacts = self._term_arrays(term)
+                    idf = math.log(1 + (n_docs - len(slots) + 0.5) / (len(slots) + 0.5))
+                    group.append((boost * idf * k1_plus_one, slots, impacts))
+                if group:
+                    groups.append(group)
+
+            code = self._category_codes.get(category, -2) if category else None
+            categories = self._slot_category
+
+            if not groups:
+                top_slots, top_scores = np.zeros(0, dtype=np.int64), np.zeros(0)
+                facet_counts = np.zeros(len(self._category_names), dtype=np.int64)
+                total = 0
+            elif len(groups) == 1 and len(groups[0]) == 1:
+                # One term: its postings are already in score order, so the
+                # requested page is a slice and nothing else needs scoring
+                weight, slots, impacts = groups[0][0]
+                matched_categories = categories[slots]
+                facet_counts = self._facet_counts(matched_categories)
+                if code is not None:
+                    keep = matched_categories == code
+                    slots, impacts = slots[keep], impacts[keep]
+                total = len(slots)
+                top_slots, top_scores = slots[offset:k], weight * impacts[offset:k]
+            else:
+                scores = np.zeros(len(norms))
+                matched = np.zeros(len(norms), dtype=bool)
+                for group in groups:
+                    if len(group) == 1:
+                        weight, slots, impacts = group[0]
+                        scores[slots] += weight * impacts
+                        matched[slots] = True
+                        continue
+                    # A token that expands to several terms scores its best match
+                    best = np.zeros(len(norms))
+                    for weight, slots, impacts in group:
+                        best[slots] = np.maximum(best[slots], weight * impacts)
+                        matched[slots] = True
+                    scores += best
+
+                candidates = np.flatnonzero(matched)
+                matched_categories = categories[candidates]
+                facet_counts = self._facet_counts(matched_categories)
+                if code is not None:
+                    candidates = candidates[matched_categories == code]
+                total = len(candidates)
+                candidate_scores = scores[candidates]
+                if 0 < k < total:
+                    keep = np.argpartition(-candidate_scores, k - 1)[:k]
+                    candidates, candidate_scores = candidates[keep], candidate_scores[keep]
+                order = np.lexsort((candidates, -candidate_scores))[offset:k]
+                top_slots, top_scores = candidates[order], candidate_scores[order]
+
+            hits = []
+            for slot, score in zip(top_slots.tolist(), top_scores.tolist()):
+                doc_id = self._slot_ids[slot]
+                doc = self._docs[doc_id]
+                hits.append({
+                    "id": doc_id,
+                    "title": doc.get("title"),
+                    "category": doc.get("category"),
+                    "score": round(score, 4),
+                })
+            facets = sorted(
+                ((self._category_names[c], int(facet_counts[c])) for c in np.flatnonzero(facet_counts)),
+                key=lambda item: -item[1]
+            )
+
+        return {
+            "query": query,
+            "total": int(total),
+            "hits": hits,
+            "facets": {"category": dict(facets)},
+            "took_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def _facet_counts(self, matched_categories):
+        """Matches per category code, ignoring documents without a category"""
+        return np.bincount(matched_categories[matched_categories >= 0], minlength=len(self._category_names))
+
+    def _average_length(self):
+        n_docs = len(self._doc_len)
+        # All-empty documents would make every length norm divide by zero
+        return (self._total_len / n_docs) if n_docs and self._total_len > 0 else 1.0
+
+    def _refresh_norm(self, doc_id):
+        """Keep the cached norm of one document current, or drop the cache if the average drifted"""
+        if self._norms is None:
+            return
+        avg_len = self._average_length()
+        if abs(avg_len - self._norm_avg_len) > self.NORM_DRIFT * self._norm_avg_len:
+            self._norms = None
+            self._clear_term_cache()
+            return
+        slot = self._slot_of[doc_id]
+        self._norms[slot] = self.K1 * (1 - self.B + self.B * self._slot_len[slot] / self._norm_avg_len)
+
+    def _length_norms(self):
+        """Per-slot BM25 length normalisation, rebuilt only when the average length drifts"""
+        if self._norms is None:
+            avg_len = self._average_length()
+            self._norms = self.K1 * (1 - self.B + self.B * self._slot_len / avg_len)
+            self._norm_avg_len = avg_len
+            self._clear_term_cache()
+        return self._norms
+
+    def _expand(self, token, prefix=False):
+        """Return (term, boost) pairs a query token should match"""
+        expansions = {}
+        if token in self._postings:
+            expansions[token] = 1.0
+
+        if prefix:
+            start = bisect.bisect_left(self._sorted_terms, token)
+            for term in self._sorted_terms[start:start + self.PREFIX_EXPANSIONS + 1]:
+                if not term.startswith(token):
+                    break
+                expansions.setdefault(term, self.PREFIX_WEIGHT)
+
+        if not expansions and len(token) >= self.FUZZY_MIN_LENGTH:
+            candidates = set(self._delete_index.get(token, ()))
+            for variant in _deletes(token):
+                if variant in self._postings:
+                    candidates.add(variant)
+                candidates.update(self._delete_index.get(variant, ()))
+            for term in candidates:
+                if term in self._postings and _within_one_edit(token, term):
+                    expansions[term] = self.FUZZY_WEIGHT
+
+        return list(expansions.items())
+
+    def stats(self):
+        """Basic size information about the index"""
+        with self._lock:
+            return {
+                "documents": len(self._docs),
+                "terms": len(self._postings),
+                "categories": len(self._categories),
+                "with_generated_content": len(self._generated),
+            }
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path=None):
+        """
+        Atomically write the index to disk
+
+        Only the per-document state is written; postings, the prefix list
+        and the typo index are rebuilt from it on load. Each of those
+        per-document values is replaced rather than mutated on update, so
+        shallow copies taken under the lock are a consistent snapshot, and
+        the slow pickling runs without blocking searches or updates.
+        """
+        path = path or self.index_path
+        if not path:
+            return False
+        with self._save_lock:
+            with self._lock:
+                state = {
+                    "version": self.FORMAT_VERSION,
+                    "docs": dict(self._docs),
+                    "doc_terms": dict(self._doc_terms),
+                    "catalog_hash": dict(self._catalog_hash),
+                    "generated": dict(self._generated),
+                    "catalog_version": self._catalog_version,
+                }
+                self._dirty = False
+                self._last_save = time.time()
+            try:
+                directory = os.path.dirname(os.path.abspath(path))
+                os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+                    # The state has no shared or cyclic objects; without the memo, pickling is
+                    # several times faster and never stalls other threads rehashing a huge table
+                    pickler.fast = True
+                    pickler.dump(state)
+                os.replace(tmp_path, path)
+            except BaseException:
+                self._dirty = True
+                raise
+        logger.info(f"Saved search index with {len(state['docs'])} documents to {path}")
+        return True
+
+    def save_if_dirty(self, min_interval=0):
+        """
+        Persist pending changes in the background, at most once per min_interval seconds
+
+        Returns:
+            bool: True if a save was started
+        """
+        with self._lock:
+            if not self._dirty or time.time() - self._last_save < min_interval:
+                return False
+            if self._save_thread is not None and self._save_thread.is_alive():
+                return False
+            self._save_thread = threading.Thread(target=self._save_in_background, name="search-index-save")
+            self._save_thread.start()
+        return True
+
+    def _save_in_background(self):
+        try:
+            self.save()
+        except Exception as e:
+            logger.error(f"Error saving search index: {str(e)}")
+
+    def wait_for_save(self, timeout=None):
+        """Block until a background save started by save_if_dirty has finished"""
+        thread = self._save_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def load(self, path=None):
+        """Load a previously saved index, falling back to an empty one"""
+        path = path or self.index_path
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+            if state.get("version") not in (1, self.FORMAT_VERSION):
+                logger.warning(f"Ignoring search index at {path} with unsupported format")
+                return False
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            logger.error(f"Error loading search index from {path}: {str(e)}")
+            return False
+
+        with self._lock:
+            self._reset()
+            self._doc_terms = state["doc_terms"]
+            self._docs = state["docs"]
+            self._catalog_hash = state["catalog_hash"]
+            self._generated = state["generated"]
+            self._catalog_version = state.get("catalog_version")
+            self._rebuild_postings()
+            self._rebuild_slots()
+            self._length_norms()
+            self._warm_term_cache()
+            self._dirty = False
+        logger.info(f"Loaded search index with {len(self._docs)} documents from {path}")
+        return True
@@ -0,0 +1,533 @@
+import bisect
+import hashlib
+import logging
+from collections import Counter
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def _byte_lookup(chars):
+    table = np.zeros(256, dtype=bool)
+    table[np.frombuffer(chars, dtype=np.uint8)] = True
+    return table
+
+
+SENTENCE_MARKS = _byte_lookup(b".!?")
+VOWELS = _byte_lookup(b"aeiouy")
+# Word tokens are runs of [a-z0-9'] in the lowercased UTF-8 text
+WORD_BYTES = _byte_lookup(b"abcdefghijklmnopqrstuvwxyz0123456789'")
+BLANK_BYTES = _byte_lookup(b" \t\n\r\x0b\x0c\x00\x01")
+
+# Separators in the batched keyword column: between items and between keywords
+_ITEM_SEP, _KEYWORD_SEP = "\x00", "\x01"
+_HASH_BASE = np.uint64(0x100000001B3)
+_GRAM_BASE = np.uint64(0x9E3779B97F4A7C15)
+
+# Upper bound for the random MinHash permutation coefficients
+_MINHASH_PRIME = (1 << 61) - 1
+
+
+def _mix(values):
+    """splitmix64 finalizer, so polynomial hashes make good MinHash and lookup keys"""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _tokenize_column(column):
+    """
+    Find the WORD_PATTERN tokens of a byte column and hash each of them
+
+    Returns:
+        tuple: (token start offsets, 64-bit token hashes), in column order
+    """
+    mask = np.take(WORD_BYTES, column)
+    edges = np.diff(np.concatenate(([False], mask, [False])).view(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    lengths = np.flatnonzero(edges == -1) - starts
+    if not starts.size:
+        return starts, np.zeros(0, dtype=np.uint64)
+
+    # Polynomial hash of each token: sum of byte * BASE ** (bytes left in the token)
+    powers = _powers(_HASH_BASE, int(lengths.max()))
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    left = np.repeat(offsets + lengths - 1, lengths) - np.arange(int(lengths.sum()))
+    terms = np.compress(mask, column).astype(np.uint64) * np.take(powers, left)
+    return starts, _mix(np.add.reduceat(terms, offsets))
+
+
+def _powers(base, count):
+    """base ** 0 .. base ** (count - 1) with uint64 wrap-around"""
+    powers = np.ones(count, dtype=np.uint64)
+    if count > 1:
+        powers[1:] = np.cumprod(np.full(count - 1, base, dtype=np.uint64))
+    return powers
+
+
+def _doc_keys(hashes, docs):
+    """Lookup keys that only match a hash within the same document"""
+    return _mix(hashes * _GRAM_BASE + docs.astype(np.uint64))
+
+
+def _gram_hashes(token_hashes, length):
+    """Hash of every run of `length` consecutive tokens, keyed by its first token"""
+    grams = token_hashes[:token_hashes.size - length + 1].copy()
+    for offset in range(1, length):
+        grams = grams * _GRAM_BASE + token_hashes[offset:token_hashes.size - length + 1 + offset]
+    return grams
+
+
+class SEOAuditor:
+    """Batch SEO audit engine scoring generated content across a whole catalog"""
+
+    # Thresholds mirror the per-product checks in the Streamlit SEOMetrics component
+    TITLE_MIN, TITLE_MAX = 30, 60
+    META_MIN, META_MAX = 120, 160
+    WORDS_MIN, WORDS_MAX = 150, 300
+    KEYWORDS_MIN, KEYWORDS_MAX = 5, 10
+    DENSITY_MIN, DENSITY_MAX = 0.01, 0.03
+    READABILITY_MIN, READABILITY_MAX = 50.0, 80.0
+
+    SCORE_WEIGHTS = {
+        "title": 20,
+        "meta": 15,
+        "length": 15,
+        "keywords": 10,
+        "density": 10,
+        "coverage": 10,
+        "readability": 10,
+        "uniqueness": 10,
+    }
+
+    NUM_PERMUTATIONS = 32
+    LSH_BANDS = 8
+    SHINGLE_SIZE = 3
+    DUPLICATE_THRESHOLD = 0.8
+
+    def __init__(self, batch_size=1000, poor_score=60, seed=42):
+        self.batch_size = max(1, int(batch_size))
+        self.poor_score = poor_score
+        rng = np.random.default_rng(seed)
+        self._perm_a = rng.integers(1, _MINHASH_PRIME, self.NUM_PERMUTATIONS, dtype=np.uint64)
+        self._perm_b = rng.integers(0, _MINHASH_PRIME, self.NUM_PERMUTATIONS, dtype=np.uint64)
+        self._rows_per_band = self.NUM_PERMUTATIONS // self.LSH_BANDS
+
+    def audit(self, items):
+        """
+        Audit generated content and yield one result per item, then a summary
+
+        Items are processed in batches so results can be streamed while the
+        rest of the catalog is still being scored. Duplicate detection is
+        carried across batches: an item is flagged when it is a near-copy of
+        any earlier item.
+
+        Args:
+            items (iterable): Dicts with seo_title, meta_description,
+                description and keywords (plus an optional product_id)
+
+        Yields:
+            dict: Per-item results, followed by a final {"summary": {...}}
+        """
+        state = {
+            "band_tables": [{} for _ in range(self.LSH_BANDS)],
+            "signature_batches": [],
+            "batch_starts": [],
+            "ids": [],
+            "exact": {},
+        }
+        scores = []
+        issue_counts = Counter()
+        poor_ids = []
+
+        for batch in self._batches(items):
+            for result in self._audit_batch(batch, state):
+                scores.append(result["score"])
+                issue_counts.update(result["issues"])
+                if result["score"] < self.poor_score:
+                    poor_ids.append(result["product_id"])
+                yield result
+
+        score_array = np.asarray(scores, dtype=np.float64)
+        yield {
+            "summary": {
+                "audited": int(score_array.size),
+                "mean_score": round(float(score_array.mean()), 2) if score_array.size else None,
+                "median_score": round(float(np.median(score_array)), 2) if score_array.size else None,
+                "poor_count": len(poor_ids),
+                "poor_threshold": self.poor_score,
+                "regenerate": poor_ids,
+                "issues": dict(issue_counts.most_common()),
+            }
+        }
+
+    def rank_variants(self, variants, reference_texts=(), focus_keywords=(), target_words=None):
+        """
+        Rank alternative descriptions of one product with cheap local heuristics
+
+        Variants are audited together with the reference texts (e.g. the
+        current description and those of similar catalog products), so the
+        duplicate check penalizes variants that copy the catalog or each other.
+
+        Args:
+            variants (list): Generated content dicts
+            reference_texts (iterable): Existing descriptions to check duplication against
+            focus_keywords (iterable): Keywords the description should cover
+            target_words (tuple): Desired (min, max) word count, defaults to the audit band
+
+        Returns:
+            list: Variants sorted best first, each with a "ranking" breakdown
+        """
+        references = [{"product_id": None, "description": text} for text in reference_texts if text]
+        items = references + [dict(variant, product_id=i) for i, variant in enumerate(variants)]
+        results = [r for r in self.audit(items) if "summary" not in r][len(references):]
+
+        low, high = target_words or (self.WORDS_MIN, self.WORDS_MAX)
+        word_count = np.array([r["metrics"]["word_count"] for r in results], dtype=np.float64)
+        length_fit = self._band_score(word_count, low, high)
+
+        focus = [k.lower().strip() for k in focus_keywords if k and k.strip()]
+        texts = [str(v.get("description") or "").lower() for v in variants]
+        if focus:
+            focus_coverage = np.array([sum(1 for k in focus if k in t) / len(focus) for t in texts])
+        else:
+            focus_coverage = np.ones(len(variants))
+
+        rank_score = (0.7 * np.array([r["score"] for r in results])
+                      + 15 * length_fit + 15 * focus_coverage)
+
+        ranked = []
+        for i in np.argsort(-rank_score, kind="stable"):
+            result = results[i]
+            ranked.append(dict(variants[i], ranking={
+                "rank_score": round(float(rank_score[i]), 1),
+                "seo_score": result["score"],
+                "length_fit": round(float(length_fit[i]), 3),
+                "focus_keyword_coverage": round(float(focus_coverage[i]), 3),
+                "duplicate_similarity": result["metrics"]["duplicate_similarity"],
+                "issues": result["issues"],
+            }))
+        return ranked
+
+    def _batches(self, items):
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _audit_batch(self, batch, state):
+        """Score one batch column-wise and return per-item result dicts"""
+        n = len(batch)
+        ids = [item.get("product_id", item.get("id")) for item in batch]
+        titles = [str(item.get("seo_title") or item.get("title") or "") for item in batch]
+        metas = [str(item.get("meta_description") or "") for item in batch]
+        texts = [str(item.get("optimized_description") or item.get("description") or "").lower()
+                 for item in batch]
+        keyword_texts = [self._keyword_text(item.get("keywords")) for item in batch]
+
+        # Column extraction: the texts are scanned as one byte column, the scoring below is pure NumPy
+        title_len = np.fromiter((len(t) for t in titles), dtype=np.int64, count=n)
+        meta_len = np.fromiter((len(m) for m in metas), dtype=np.int64, count=n)
+        encoded = [t.encode("utf-8") for t in texts]
+        lengths = np.fromiter((len(e) + 1 for e in encoded), dtype=np.int64, count=n)
+        # Each text is followed by a separator byte so no run spans two texts
+        column = np.frombuffer(b"\n".join(encoded) + b"\n", dtype=np.uint8)
+        text_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        token_starts, token_hashes = _tokenize_column(column)
+        token_doc = np.searchsorted(text_starts, token_starts, side="right") - 1
+        word_count = np.bincount(token_doc, minlength=n)
+        sentence_count, syllable_count = self._count_runs(column, text_starts)
+        keyword_count, keyword_hits, keyword_words = self._keyword_matches(
+            keyword_texts, token_doc, token_hashes, n)
+
+        safe_words = np.maximum(word_count, 1)
+        density = keyword_words / safe_words
+        coverage = np.where(keyword_count > 0, keyword_hits / np.maximum(keyword_count, 1), 0.0)
+        readability = (206.835
+                       - 1.015 * (word_count / np.maximum(sentence_count, 1))
+                       - 84.6 * (syllable_count / safe_words))
+        readability = np.where(word_count > 0, readability, 0.0)
+
+        similarity, duplicate_of = self._detect_duplicates(ids, texts, token_hashes, word_count, state)
+
+        components = {
+            "title": self._band_score(title_len, self.TITLE_MIN, self.TITLE_MAX),
+            "meta": self._band_score(meta_len, self.META_MIN, self.META_MAX),
+            "length": self._band_score(word_count, self.WORDS_MIN, self.WORDS_MAX),
+            "keywords": self._band_score(keyword_count, self.KEYWORDS_MIN, self.KEYWORDS_MAX),
+            "density": self._band_score(density, self.DENSITY_MIN, self.DENSITY_MAX),
+            "coverage": coverage,
+            "readability": self._band_score(readability, self.READABILITY_MIN, self.READABILITY_MAX),
+            "uniqueness": np.clip((1.0 - similarity) / (1.0 - self.DUPLICATE_THRESHOLD / 2), 0.0, 1.0),
+        }
+        score = sum(components[name] * weight for name, weight in self.SCORE_WEIGHTS.items())
+
+        issues = {
+            "title_too_long": title_len > self.TITLE_MAX,
+            "title_too_short": title_len < self.TITLE_MIN,
+            "meta_missing": meta_len == 0,
+            "meta_too_long": meta_len > self.META_MAX,
+            "meta_too_short": (meta_len > 0) & (meta_len < self.META_MIN),
+            "description_too_short": word_count < self.WORDS_MIN,
+            "description_too_long": word_count > self.WORDS_MAX,
+            "keyword_count_out_of_range": (keyword_count < self.KEYWORDS_MIN) | (keyword_count > self.KEYWORDS_MAX),
+            "keyword_stuffing": density > self.DENSITY_MAX * 2,
+            "low_keyword_coverage": (keyword_count > 0) & (coverage < 0.5),
+            "hard_to_read": readability < self.READABILITY_MIN - 20,
+            "duplicate_content": similarity >= self.DUPLICATE_THRESHOLD,
+        }
+
+        # Convert whole columns to Python values once instead of indexing per item
+        def rounded(values, digits):
+            return [round(value, digits) for value in values.tolist()]
+
+        item_issues = [[] for _ in range(n)]
+        for name, mask in issues.items():
+            for i in np.flatnonzero(mask).tolist():
+                item_issues[i].append(name)
+
+        columns = zip(ids, rounded(score, 1), title_len.tolist(), meta_len.tolist(), word_count.tolist(),
+                      keyword_count.tolist(), rounded(density, 4), rounded(coverage, 3),
+                      rounded(readability, 1), rounded(similarity, 3), duplicate_of, item_issues)
+        results = []
+        for (product_id, item_score, title_length, meta_length, words, keywords, item_density,
+             item_coverage, item_readability, item_similarity, item_duplicate_of, item_issue_list) in columns:
+            results.append({
+                "product_id": product_id,
+                "score": item_score,
+                "metrics": {
+                    "title_length": title_length,
+                    "meta_length": meta_length,
+                    "word_count": words,
+                    "keyword_count": keywords,
+                    "keyword_density": item_density,
+                    "keyword_coverage": item_coverage,
+                    "readability": item_readability,
+                    "duplicate_similarity": item_similarity,
+                    "duplicate_of": item_duplicate_of,
+                },
+                "issues": item_issue_list,
+            })
+        return results
+
+    @staticmethod
+    def _keyword_text(value):
+        """One item's keywords as a single string, separated by _KEYWORD_SEP"""
+        if not value:
+            return ""
+        if isinstance(value, str):
+            # Models sometimes return "a, b, c" instead of a list
+            text = value.replace(",", _KEYWORD_SEP)
+        elif isinstance(value, (list, tuple)):
+            text = _KEYWORD_SEP.join(map(str, value))
+        else:
+            text = str(value)
+        return text.replace(_ITEM_SEP, " ")
+
+    @staticmethod
+    def _keyword_matches(keyword_texts, token_doc, token_hashes, n):
+        """
+        Count each item's keywords and their occurrences in its text
+
+        The keywords of the whole batch are tokenized as one byte column.
+        A keyword matches a run of whole tokens in the text, so "slim fit"
+        matches "Slim-fit" but "gold" does not match "golden". Occurrences
+        are counted by looking up each keyword's hash among the sorted
+        hashes of equally long token runs, keyed by item.
+
+        Returns:
+            tuple: (keyword_count, keyword_hits, keyword_words) arrays, where
+            hits counts keywords found at least once and words counts the
+            text words covered by keyword occurrences
+        """
+        column = np.frombuffer(_ITEM_SEP.join(keyword_texts).lower().encode("utf-8"), dtype=np.uint8)
+        separators = (column == ord(_ITEM_SEP)) | (column == ord(_KEYWORD_SEP))
+        phrase_of_byte = np.cumsum(separators)
+        n_phrases = int(separators.sum()) + 1
+        phrase_doc = np.concatenate(([0], np.cumsum(column == ord(_ITEM_SEP))[separators]))
+
+        nonblank = np.bincount(phrase_of_byte[~np.take(BLANK_BYTES, column)], minlength=n_phrases) > 0
+        keyword_count = np.bincount(phrase_doc[nonblank], minlength=n)
+
+        kw_starts, kw_hashes = _tokenize_column(column)
+        occurrences = np.zeros(n_phrases, dtype=np.int64)
+        if kw_hashes.size and token_hashes.size:
+            token_phrase = phrase_of_byte[kw_starts]
+            phrase_len = np.bincount(token_phrase, minlength=n_phrases)
+            first_token = np.cumsum(phrase_len) - phrase_len
+            # Same polynomial as _gram_hashes: h0 * G^(L-1) + h1 * G^(L-2) + ...
+            exponent = (phrase_len[token_phrase] - 1) - (np.arange(kw_hashes.size) - first_token[token_phrase])
+            has_tokens = phrase_len > 0
+            phrase_hash = np.zeros(n_phrases, dtype=np.uint64)
+            phrase_hash[has_tokens] = np.add.reduceat(
+                kw_hashes * _powers(_GRAM_BASE, int(phrase_len.max()))[exponent], first_token[has_tokens])
+
+            for length in np.unique(phrase_len[has_tokens]).tolist():
+                if length > token_hashes.size:
+                    continue
+                grams = _gram_hashes(token_hashes, length)
+                gram_doc = token_doc[:grams.size]
+                same_doc = token_doc[length - 1:] == gram_doc
+                text_keys = np.sort(_doc_keys(grams[same_doc], gram_doc[same_doc]))
+                wanted = phrase_len == length
+                keys = _doc_keys(phrase_hash[wanted], phrase_doc[wanted])
+                occurrences[wanted] = (np.searchsorted(text_keys, keys, side="right")
+                                       - np.searchsorted(text_keys, keys, side="left"))
+        else:
+            phrase_len = np.zeros(n_phrases, dtype=np.int64)
+
+        keyword_hits = np.bincount(phrase_doc, weights=occurrences > 0, minlength=n).astype(np.int64)
+        keyword_words = np.bincount(phrase_doc, weights=occurrences * phrase_len, minlength=n).astype(np.int64)
+        return keyword_count, keyword_hits, keyword_words
+
+    @staticmethod
+    def _count_runs(column, starts):
+        """
+        Count sentence-ending punctuation runs and vowel groups per text
+
+        All texts of the batch are scanned as one byte column; a run starts
+        wherever a matching byte follows a non-matching one, and per-text
+        totals come from a segmented sum.
+
+        Args:
+            column (numpy.ndarray): Texts as UTF-8 bytes, each followed by a separator
+            starts (numpy.ndarray): Offset of each text in the column
+
+        Returns:
+            tuple: (sentence_count, syllable_count) integer arrays
+        """
+        counts = []
+        for lookup in (SENTENCE_MARKS, VOWELS):
+            mask = np.take(lookup, column)
+            run_start = mask.copy()
+            run_start[1:] &= ~mask[:-1]
+            counts.append(np.add.reduceat(run_start.astype(np.int64), starts))
+        return counts[0], counts[1]
+
+    @staticmethod
+    def _band_score(values, low, high):
+        """1.0 inside [low, high], decaying linearly to 0 at half/double the band edges"""
+        values = np.asarray(values, dtype=np.float64)
+        below = np.clip((values - low / 2) / (low / 2), 0.0, 1.0)
+        above = np.clip((2 * high - values) / high, 0.0, 1.0)
+        return np.where(values < low, below, np.where(values > high, above, 1.0))
+
+    def _detect_duplicates(self, ids, texts, token_hashes, word_count, state):
+        """
+        Flag items whose text is an exact or near copy of an earlier item
+
+        Near duplicates are found with MinHash signatures over word shingles
+        and LSH banding: each band remembers the first item that hashed to a
+        bucket, so every item is compared with at most LSH_BANDS earlier
+        candidates, all in one vectorized comparison per batch.
+        """
+        n = len(texts)
+        similarity = np.zeros(n, dtype=np.float64)
+        duplicate_of = [None] * n
+        base = len(state["ids"])
+
+        signatures = self._minhash_batch(token_hashes, word_count)
+        state["ids"].extend(ids)
+        state["signature_batches"].append(signatures)
+        state["batch_starts"].append(base)
+
+        # Collapse each band of signature rows into one integer bucket key
+        band_keys = np.zeros((n, self.LSH_BANDS), dtype=np.uint64)
+        for row in signatures.reshape(n, self.LSH_BANDS, self._rows_per_band).transpose(2, 0, 1):
+            band_keys = band_keys * np.uint64(0x100000001B3) + row
+
+        candidates = np.full((n, self.LSH_BANDS), -1, dtype=np.int64)
+        present = np.flatnonzero(word_count > 0).tolist()
+        for band, table in enumerate(state["band_tables"]):
+            keys = band_keys[:, band].tolist()
+            for i in present:
+                first = table.setdefault(keys[i], base + i)
+                if first != base + i:
+                    candidates[i, band] = first
+
+        rows, bands = np.nonzero(candidates >= 0)
+        if rows.size:
+            pairs = np.unique(np.stack([rows, candidates[rows, bands]], axis=1), axis=0)
+            rows, others = pairs[:, 0], pairs[:, 1]
+            earlier = np.stack([self._signature_at(state, int(p)) for p in others])
+            scores = (earlier == signatures[rows]).mean(axis=1)
+            np.maximum.at(similarity, rows, scores)
+            # lexsort puts the best-scoring candidate last within each row
+            order = np.lexsort((scores, rows))
+            last = np.r_[rows[order][1:] != rows[order][:-1], True]
+            for row, other, score in zip(rows[order][last], others[order][last], scores[order][last]):
+                if score >= self.DUPLICATE_THRESHOLD:
+                    duplicate_of[row] = state["ids"][other]
+
+        for i in present:
+            digest = hashlib.sha1(texts[i].encode("utf-8")).digest()
+            if digest in state["exact"]:
+                similarity[i] = 1.0
+                duplicate_of[i] = state["exact"][digest]
+            else:
+                state["exact"][digest] = ids[i]
+
+        return similarity, duplicate_of
+
+    @staticmethod
+    def _signature_at(state, position):
+        batch = bisect.bisect_right(state["batch_starts"], position) - 1
+        return state["signature_batches"][batch][position - state["batch_starts"][batch]]
+
+    def _minhash_batch(self, flat, lengths):
+        """
+        MinHash signatures of word shingles for a whole batch at once
+
+        Shingle hashes are combined over the flat array of all token hashes
+        of the batch, and per-document minima come from a segmented
+        reduction, so there is no Python loop per shingle.
+
+        Args:
+            flat (numpy.ndarray): uint64 token hashes of all documents, in order
+            lengths (numpy.ndarray): Number of tokens per document
+
+        Returns:
+            numpy.ndarray: (len(lengths), NUM_PERMUTATIONS) signature matrix;
+            rows for empty documents are left at the maximum value
+        """
+        n = len(lengths)
+        signatures = np.full((n, self.NUM_PERMUTATIONS), np.iinfo(np.uint64).max, dtype=np.uint64)
+        if not lengths.any():
+            return signatures
+
+        doc_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+        # Combine each window of SHINGLE_SIZE consecutive word hashes; documents
+        # shorter than the window fall back to single-word shingles
+        size = min(self.SHINGLE_SIZE, int(lengths.max()))
+        shingles = flat.copy()
+        for offset in range(1, size):
+            shifted = np.zeros_like(flat)
+            shifted[:-offset] = flat[offset:]
+            shingles = shingles * np.uint64(0x9E3779B97F4A7C15) + shifted
+        position = np.arange(flat.size) - np.repeat(doc_starts, lengths)
+        window = np.where(lengths >= self.SHINGLE_SIZE, self.SHINGLE_SIZE, 1)
+        valid = position <= np.repeat(lengths - window, lengths)
+        short = np.repeat(lengths < self.SHINGLE_SIZE, lengths)
+        shingles = np.where(short, flat, shingles)[valid]
+
+        counts = np.where(lengths >= self.SHINGLE_SIZE, lengths - self.SHINGLE_SIZE + 1, lengths)
+        nonempty = counts > 0
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[nonempty]
+
+        # Multiply-add with uint64 wrap-around is a cheap universal hash family,
+        # which is plenty for estimating Jaccard similarity. Permutations are
+        # processed in chunks to bound the size of the intermediate matrix.
+        chunk = 16
+        for lo in range(0, self.NUM_PERMUTATIONS, chunk):
+            a = self._perm_a[lo:lo + chunk, None]
+            b = self._perm_b[lo:lo + chunk, None]
+            permuted = a * shingles[None, :] + b
+            signatures[nonempty, lo:lo + chunk] = np.minimum.reduceat(permuted, starts, axis=1).T
+        return signatures
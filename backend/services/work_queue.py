@@ -0,0 +1,361 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id INTEGER PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'pending',
+    lease_token TEXT,
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    reissues INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS batches_by_state ON batches (state, lease_expires);
+CREATE TABLE IF NOT EXISTS items (
+    product_key TEXT PRIMARY KEY,
+    batch_id INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_by_batch ON items (batch_id);
+CREATE TABLE IF NOT EXISTS results (
+    product_key TEXT PRIMARY KEY,
+    record TEXT NOT NULL,
+    worker TEXT,
+    finished_at REAL NOT NULL
+);
+"""
+
+
+def product_key(product):
+    """Stable key for a product: its ID, or a content hash if it has none"""
+    product_id = product.get('id')
+    if product_id is not None:
+        return json.dumps(product_id)
+    raw = json.dumps(product, sort_keys=True, ensure_ascii=False, default=str)
+    return "sha1:" + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def record_key(record):
+    """Key of the product an output record belongs to"""
+    return record.get("key") or json.dumps(record.get("id"))
+
+
+class Lease:
+    """One batch of products handed to a worker until expires_at"""
+
+    __slots__ = ("batch_id", "token", "owner", "expires_at", "attempt", "products")
+
+    def __init__(self, batch_id, token, owner, expires_at, attempt, products):
+        self.batch_id = batch_id
+        self.token = token
+        self.owner = owner
+        self.expires_at = expires_at
+        self.attempt = attempt
+        self.products = products
+
+
+class WorkQueue:
+    """
+    SQLite work table that leases product batches to worker processes
+
+    Products are enqueued once and grouped into batches. A worker leases a
+    batch for lease_seconds and keeps it alive with heartbeats; a batch
+    whose lease runs out (the worker died or hung) is re-issued to the next
+    worker that asks. Results are keyed by product, and the first write
+    wins, so a re-issued batch never produces duplicates and only products
+    without a result are handed out again.
+
+    Leases are compared against wall-clock time, so workers on different
+    hosts need roughly synchronized clocks. WAL mode only works on a local
+    disk; use journal_mode="DELETE" when the database lives on a shared
+    network volume.
+    """
+
+    def __init__(self, db_path, lease_seconds=120, max_attempts=3, journal_mode="WAL", busy_timeout=30.0):
+        """
+        Args:
+            db_path (str): SQLite database file shared by all workers
+            lease_seconds (float): How long a batch stays with a silent worker
+            max_attempts (int): Leases per batch before it is marked failed
+            journal_mode (str): SQLite journal mode, WAL or DELETE
+            busy_timeout (float): Seconds to wait for another writer's lock
+        """
+        self.db_path = db_path
+        self.lease_seconds = float(lease_seconds)
+        self.max_attempts = max(1, int(max_attempts))
+        self.journal_mode = journal_mode
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            conn.execute("PRAGMA synchronous=NORMAL" if self.journal_mode.upper() == "WAL"
+                         else "PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, func):
+        """Run func(conn) inside one write transaction"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = func(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def enqueue(self, products, batch_size=20):
+        """
+        Add products that are not queued yet, in new batches of batch_size
+
+        Args:
+            products (iterable): Product dicts, keyed by 'id' or by content if they have none
+            batch_size (int): Products per lease
+
+        Returns:
+            int: Number of newly queued products
+        """
+        batch_size = max(1, int(batch_size))
+
+        def insert(conn):
+            next_batch = conn.execute("SELECT COALESCE(MAX(batch_id), 0) FROM batches").fetchone()[0] + 1
+            added = in_batch = 0
+            for product in products:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO items (product_key, batch_id, payload) VALUES (?, ?, ?)",
+                    (product_key(product), next_batch, json.dumps(product, ensure_ascii=False))
+                )
+                if not cursor.rowcount:
+                    continue
+                added += 1
+                in_batch += 1
+                if in_batch == batch_size:
+                    conn.execute("INSERT INTO batches (batch_id) VALUES (?)", (next_batch,))
+                    next_batch += 1
+                    in_batch = 0
+            if in_batch:
+                conn.execute("INSERT INTO batches (batch_id) VALUES (?)", (next_batch,))
+            return added
+
+        return self._write(insert)
+
+    def lease(self, owner):
+        """
+        Lease the next pending or expired batch
+
+        Args:
+            owner (str): Worker identifier recorded on the lease
+
+        Returns:
+            Lease: The leased batch, or None if nothing is available right now
+        """
+        def take(conn):
+            while True:
+                now = time.time()
+                row = conn.execute(
+                    "SELECT batch_id, state, attempts FROM batches "
+                    "WHERE state = ? OR (state = ? AND lease_expires < ?) "
+                    "ORDER BY batch_id LIMIT 1",
+                    (PENDING, LEASED, now)
+                ).fetchone()
+                if row is None:
+                    return None
+                batch_id, state, attempts = row
+
+                if state == LEASED:
+                    logger.warning(f"Lease on batch {batch_id} expired, re-issuing")
+                if attempts >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE batches SET state = ?, lease_token = NULL, "
+                        "last_error = COALESCE(last_error, 'lease expired') WHERE batch_id = ?",
+                        (FAILED, batch_id)
+                    )
+                    continue
+
+                products = [json.loads(payload) for (payload,) in conn.execute(
+                    "SELECT i.payload FROM items i LEFT JOIN results r ON r.product_key = i.product_key "
+                    "WHERE i.batch_id = ? AND r.product_key IS NULL ORDER BY i.rowid",
+                    (batch_id,)
+                )]
+                if not products:
+                    conn.execute("UPDATE batches SET state = ?, lease_token = NULL WHERE batch_id = ?",
+                                 (DONE, batch_id))
+                    continue
+
+                token = uuid.uuid4().hex
+                expires_at = now + self.lease_seconds
+                conn.execute(
+                    "UPDATE batches SET state = ?, lease_token = ?, lease_owner = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, reissues = reissues + ? WHERE batch_id = ?",
+                    (LEASED, token, owner, expires_at, int(state == LEASED), batch_id)
+                )
+                return Lease(batch_id, token, owner, expires_at, attempts + 1, products)
+
+        return self._write(take)
+
+    def heartbeat(self, lease):
+        """Extend a lease; returns False if it already expired and was taken over"""
+        expires_at = time.time() + self.lease_seconds
+        cursor = self._write(lambda conn: conn.execute(
+            "UPDATE batches SET lease_expires = ? WHERE batch_id = ? AND lease_token = ? AND state = ?",
+            (expires_at, lease.batch_id, lease.token, LEASED)
+        ))
+        if cursor.rowcount:
+            lease.expires_at = expires_at
+            return True
+        return False
+
+    def save_results(self, lease, records):
+        """
+        Store finished records; a product that already has a result keeps it
+
+        Records are accepted even from a lease that has since expired, so
+        work that was already paid for is not thrown away.
+
+        Args:
+            lease (Lease): Lease the records were produced under
+            records (list): Result dicts with the product 'id', or its 'key' if it has none
+
+        Returns:
+            int: Number of records that were new
+        """
+        if not records:
+            return 0
+        now = time.time()
+        rows = [(record_key(r), json.dumps(r, ensure_ascii=False), lease.owner, now) for r in records]
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO results (product_key, record, worker, finished_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            return conn.total_changes - before
+
+        return self._write(insert)
+
+    def complete(self, lease, errors=None):
+        """
+        Close a lease once its batch has been worked through
+
+        The batch is done when every product has a result. Otherwise it goes
+        back to pending for another attempt, or is marked failed after
+        max_attempts. A lease that was already taken over is left alone.
+
+        Args:
+            lease (Lease): The lease to close
+            errors (dict): Error message per product ID that failed
+
+        Returns:
+            str: The batch state afterwards, or None if the lease was lost
+        """
+        errors = errors or {}
+
+        def close(conn):
+            row = conn.execute(
+                "SELECT attempts FROM batches WHERE batch_id = ? AND lease_token = ? AND state = ?",
+                (lease.batch_id, lease.token, LEASED)
+            ).fetchone()
+            if row is None:
+                return None
+
+            missing = conn.execute(
+                "SELECT COUNT(*) FROM items i LEFT JOIN results r ON r.product_key = i.product_key "
+                "WHERE i.batch_id = ? AND r.product_key IS NULL",
+                (lease.batch_id,)
+            ).fetchone()[0]
+            if not missing:
+                state = DONE
+            elif row[0] >= self.max_attempts:
+                state = FAILED
+            else:
+                state = PENDING
+
+            last_error = "; ".join(f"{pid}: {message}" for pid, message in list(errors.items())[:5]) or None
+            conn.execute(
+                "UPDATE batches SET state = ?, lease_token = NULL, lease_expires = NULL, "
+                "last_error = COALESCE(?, last_error) WHERE batch_id = ?",
+                (state, last_error, lease.batch_id)
+            )
+            return state
+
+        return self._write(close)
+
+    def release(self, lease):
+        """Give a lease back without counting it as an attempt, e.g. on shutdown"""
+        self._write(lambda conn: conn.execute(
+            "UPDATE batches SET state = ?, lease_token = NULL, lease_expires = NULL, attempts = attempts - 1 "
+            "WHERE batch_id = ? AND lease_token = ? AND state = ?",
+            (PENDING, lease.batch_id, lease.token, LEASED)
+        ))
+
+    def retry_failed(self):
+        """Put failed batches back in the queue with a fresh attempt count"""
+        cursor = self._write(lambda conn: conn.execute(
+            "UPDATE batches SET state = ?, attempts = 0, last_error = NULL WHERE state = ?",
+            (PENDING, FAILED)
+        ))
+        return cursor.rowcount
+
+    def remaining(self):
+        """Number of batches that are not done or failed yet"""
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM batches WHERE state IN (?, ?)", (PENDING, LEASED)
+        ).fetchone()[0]
+
+    def iter_results(self):
+        """Yield result records in enqueue order"""
+        cursor = self._conn().execute(
+            "SELECT r.record FROM items i JOIN results r ON r.product_key = i.product_key ORDER BY i.rowid"
+        )
+        for (record,) in cursor:
+            yield json.loads(record)
+
+    def stats(self):
+        """Batch states, result counts per worker and completion throughput"""
+        conn = self._conn()
+        batches = {state: 0 for state in (PENDING, LEASED, DONE, FAILED)}
+        for state, count in conn.execute("SELECT state, COUNT(*) FROM batches GROUP BY state"):
+            batches[state] = count
+        items = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        results, first, last = conn.execute(
+            "SELECT COUNT(*), MIN(finished_at), MAX(finished_at) FROM results"
+        ).fetchone()
+        span = (last - first) if results > 1 else 0.0
+        return {
+            "batches": batches,
+            "items": items,
+            "results": results,
+            "reissued_leases": conn.execute("SELECT COALESCE(SUM(reissues), 0) FROM batches").fetchone()[0],
+            "per_worker": dict(conn.execute("SELECT worker, COUNT(*) FROM results GROUP BY worker")),
+            "items_per_second": round(results / span, 2) if span else None,
+            "failed_batches": [
+                {"batch_id": batch_id, "error": error}
+                for batch_id, error in conn.execute(
+                    "SELECT batch_id, last_error FROM batches WHERE state = ? ORDER BY batch_id LIMIT 20",
+                    (FAILED,)
+                )
+            ],
+        }
@@ -0,0 +1,54 @@
+import pytest
+
+import app as app_module
+from services.search_service import SearchIndex
+
+
+@pytest.fixture
+def client(monkeypatch):
+    index = SearchIndex()
+    index.sync_catalog([{"id": i, "title": f"Cotton shirt {i}", "description": "Soft cotton"}
+                        for i in range(1, 31)])
+    monkeypatch.setattr(app_module, "search_index", index)
+    return app_module.app.test_client()
+
+
+@pytest.mark.parametrize("limit, expected", [(-1, 1), (0, 1), (5, 5), (500, 30)])
+def test_search_limit_is_clamped(client, limit, expected):
+    response = client.get(f"/api/search?q=cotton&limit={limit}")
+    assert response.status_code == 200
+    assert len(response.json["data"]["hits"]) == expected
+    assert response.json["data"]["total"] == 30
+
+
+PRODUCT = {"id": 1, "title": "Laptop bag", "description": "A bag for laptops", "category": "bags"}
+
+
+@pytest.fixture
+def variants_client(client, monkeypatch):
+    def generate(product_data, category, count, mode, priority, hedge):
+        return {"variants": [{"description": f"laptop bag variant {i} " * 20} for i in range(count)],
+                "usage": {}}
+    monkeypatch.setattr(app_module.gemini_service, "generate_description_variants", generate)
+    return client
+
+
+@pytest.mark.parametrize("field, value", [
+    ("variants", "three"), ("variants", -2), ("variants", 2.5), ("variants", [3]),
+    ("focus_keywords", "cotton"), ("focus_keywords", ["cotton", 3]),
+    ("target_words", [10]), ("target_words", [200, 100]), ("target_words", ["a", "b"]),
+])
+def test_variants_request_validation(variants_client, field, value):
+    body = {"product_data": PRODUCT, "variants": 3, field: value}
+    response = variants_client.post("/api/generate-description", json=body)
+    assert response.status_code == 400
+    assert field in response.json["error"]
+
+
+def test_variants_are_ranked(variants_client):
+    body = {"product_data": PRODUCT, "variants": "3", "focus_keywords": ["laptop"], "target_words": [50, 150]}
+    response = variants_client.post("/api/generate-description", json=body)
+    assert response.status_code == 200
+    variants = response.json["data"]["variants"]
+    assert len(variants) == 3
+    assert all("ranking" in v for v in variants)
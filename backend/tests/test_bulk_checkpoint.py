@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from bulk_generate import Checkpoint
+
+
+def write_records(path, records, tail=b""):
+    with open(path, "ab") as f:
+        for record in records:
+            f.write((json.dumps(record) + "\n").encode("utf-8"))
+        f.write(tail)
+        return f.tell()
+
+
+@pytest.fixture
+def output(tmp_path):
+    return str(tmp_path / "generated.jsonl")
+
+
+def test_new_output_starts_empty(output):
+    checkpoint = Checkpoint(output)
+    assert checkpoint.done == set()
+    assert checkpoint.offset == 0
+
+
+def test_reload_rebuilds_done_from_the_output(output):
+    offset = write_records(output, [{"id": 1}, {"id": "sku-2"}, {"id": None, "key": "sha1:abc"}])
+    Checkpoint(output).save(offset)
+
+    checkpoint = Checkpoint(output)
+
+    assert checkpoint.done == {"1", '"sku-2"', "sha1:abc"}
+    assert checkpoint.offset == offset
+
+
+def test_torn_tail_is_truncated(output):
+    offset = write_records(output, [{"id": 1}, {"id": 2}])
+    Checkpoint(output).save(offset)
+    write_records(output, [], tail=b'{"id": 3, "descr')
+
+    checkpoint = Checkpoint(output)
+
+    assert checkpoint.done == {"1", "2"}
+    assert checkpoint.offset == offset
+    with open(output, "rb") as f:
+        assert f.read().endswith(b'{"id": 2}\n')
+
+
+def test_complete_records_after_the_checkpoint_are_kept(output):
+    offset = write_records(output, [{"id": 1}])
+    Checkpoint(output).save(offset)
+    end = write_records(output, [{"id": 2}], tail=b'{"id"')
+
+    checkpoint = Checkpoint(output)
+
+    assert checkpoint.done == {"1", "2"}
+    assert checkpoint.offset == end - len(b'{"id"')
+
+
+def test_corruption_before_the_checkpoint_is_an_error(output):
+    offset = write_records(output, [{"id": 1}], tail=b"not json\n")
+    with open(f"{output}.checkpoint", "w") as f:
+        json.dump({"version": 2, "offset": offset}, f)
+
+    with pytest.raises(ValueError):
+        Checkpoint(output)
+
+
+def test_corrupt_line_followed_by_records_is_not_truncated(output):
+    write_records(output, [{"id": 1}], tail=b"not json\n")
+    size = write_records(output, [{"id": 3}])
+
+    with pytest.raises(ValueError):
+        Checkpoint(output)
+    with open(output, "rb") as f:
+        assert len(f.read()) == size
+
+
+def test_output_shorter_than_checkpoint_is_rescanned(output):
+    offset = write_records(output, [{"id": 1}])
+    Checkpoint(output).save(offset + 100)
+
+    assert Checkpoint(output).done == {"1"}
+
+
+def test_version_one_checkpoint_is_accepted(output):
+    offset = write_records(output, [{"id": 1}])
+    with open(f"{output}.checkpoint", "w") as f:
+        json.dump({"version": 1, "offset": offset, "done": ["1"]}, f)
+
+    assert Checkpoint(output).done == {"1"}
+
+
+def test_unknown_checkpoint_version_is_rejected(output):
+    with open(f"{output}.checkpoint", "w") as f:
+        json.dump({"version": 99, "offset": 0}, f)
+
+    with pytest.raises(ValueError):
+        Checkpoint(output)
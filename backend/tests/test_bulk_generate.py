@@ -0,0 +1,76 @@
+import json
+import time
+from collections import Counter
+
+import pytest
+
+import bulk_generate
+from batch_worker import build_parser as build_worker_parser
+from bulk_generate import Checkpoint, build_parser, in_shard
+from config import Config
+
+
+def shard_sizes(products, count):
+    sizes = Counter()
+    for product in products:
+        shards = [index for index in range(count) if in_shard(product, (index, count))]
+        assert len(shards) == 1
+        sizes[shards[0]] += 1
+    return [sizes[index] for index in range(count)]
+
+
+def test_products_with_ids_spread_across_shards():
+    sizes = shard_sizes([{"id": i} for i in range(400)], 4)
+    assert min(sizes) > 50
+
+
+def test_products_without_ids_spread_across_shards():
+    products = [{"title": f"Product {i}", "price": i} for i in range(400)]
+    sizes = shard_sizes(products, 4)
+    assert min(sizes) > 50
+
+
+def test_shard_assignment_is_stable():
+    product = {"title": "Product", "price": 1}
+    assert in_shard(product, (0, 4)) == in_shard(dict(reversed(list(product.items()))), (0, 4))
+
+
+@pytest.mark.parametrize("argv, expected", [([], Config.INCLUDE_IMAGE_BY_DEFAULT),
+                                            (["--with-image"], True), (["--no-with-image"], False)])
+def test_with_image_flags(argv, expected):
+    args = build_parser().parse_args(["catalog.json", "-o", "out.jsonl"] + argv)
+    assert args.with_image is expected
+    args = build_worker_parser().parse_args(["work"] + argv)
+    assert args.with_image is expected
+
+
+def test_interrupt_keeps_results_of_requests_in_flight(tmp_path, monkeypatch):
+    catalog = tmp_path / "catalog.json"
+    catalog.write_text(json.dumps([{"id": i, "title": f"Product {i}"} for i in range(6)]))
+    output = str(tmp_path / "generated.jsonl")
+    generated = []
+
+    def fake_generate(gemini_service, product, *args):
+        generated.append(product["id"])
+        time.sleep(0.01 if product["id"] == 0 else 0.3)
+        return {"id": product["id"], "generated_content": {}}
+
+    interrupted = []
+
+    def update(self, ok, force=False):
+        # Ctrl-C lands while the slow products are still being generated
+        if ok and not interrupted:
+            interrupted.append(True)
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(bulk_generate, "generate_record", fake_generate)
+    monkeypatch.setattr(bulk_generate, "GeminiService", lambda *args, **kwargs: None)
+    monkeypatch.setattr(bulk_generate.ProgressReporter, "update", update)
+
+    args = build_parser().parse_args([str(catalog), "-o", output, "--concurrency", "2", "--rpm", "0"])
+    with pytest.raises(KeyboardInterrupt):
+        bulk_generate.run(args)
+
+    # Everything sent upstream is written and checkpointed; queued products are not sent
+    assert len(generated) < 6
+    assert Checkpoint(output).done == {str(product_id) for product_id in generated}
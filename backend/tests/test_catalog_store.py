@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+
+from services.catalog_store import CatalogStore
+
+
+def full_product(product_id, price=10.0, rate=4.5, count=100, category="electronics"):
+    return {
+        "id": product_id,
+        "title": f"Product {product_id}",
+        "price": price,
+        "description": f"Description of {product_id}",
+        "category": category,
+        "image": f"https://example.com/{product_id}.jpg",
+        "rating": {"rate": rate, "count": count},
+    }
+
+
+def test_integer_id_round_trip():
+    products = [full_product(i, price=float(i)) for i in (5, 1, 3)]
+    store = CatalogStore.from_products(products)
+
+    assert store.to_dicts() == products
+    assert store.get(3) == products[2]
+    assert store.get(2) is None
+    assert store.get("3") is None
+
+
+def test_non_integer_id_round_trip():
+    products = [full_product("sku-b"), full_product("sku-a"), full_product(7)]
+    store = CatalogStore.from_products(products)
+
+    assert store.ids.dtype == object
+    assert store.to_dicts() == products
+    assert store.get("sku-a") == products[1]
+    assert store.get(7) == products[2]
+    assert store.get(["unhashable"]) is None
+
+
+def test_missing_fields_are_left_out():
+    products = [
+        {"id": 1, "title": "Only a title"},
+        {"id": 2, "title": "No rate", "price": None, "rating": {"count": 3}},
+        {"title": "No id", "price": 4.0, "rating": {"rate": 3.0}},
+    ]
+    store = CatalogStore.from_products(products)
+
+    assert store.to_dicts() == [
+        {"id": 1, "title": "Only a title"},
+        {"id": 2, "title": "No rate", "rating": {"count": 3}},
+        {"title": "No id", "price": 4.0, "rating": {"rate": 3.0}},
+    ]
+    assert not store.has("price", 1)
+    assert store.has("price", 2)
+
+
+def test_filters_never_match_missing_values():
+    products = [full_product(1), {"id": 2, "title": "Bare"}, full_product(3, rate=None, count=None)]
+    store = CatalogStore.from_products(products)
+
+    assert store.filter(min_price=0).tolist() == [0, 2]
+    assert store.filter(min_rating=0).tolist() == [0]
+    assert store.filter(min_reviews=0).tolist() == [0]
+
+
+def test_malformed_values_pass_through_unchanged():
+    products = [
+        {"id": 1, "title": 123, "price": "N/A", "description": ["not", "text"],
+         "category": 5, "rating": {"rate": "unrated", "count": 3}},
+        {"id": 2, "title": "Fine", "price": 2.0, "rating": "not a dict"},
+        full_product(3, price=1.0),
+    ]
+    store = CatalogStore.from_products(products)
+
+    for original, view in zip(products, store.to_dicts()):
+        assert view == original
+    assert math.isnan(store.prices[0]) and not store.has("price", 0)
+    assert np.isnan(store.rates[0]) and not store.has("rate", 0)
+    assert store.title(0) == "123"
+    assert store.category(0) == "5"
+    assert store.filter(min_price=0).tolist() == [1, 2]
+    assert store.filter(min_rating=0).tolist() == [2]
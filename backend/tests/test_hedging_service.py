@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+
+from services.hedging_service import AttemptCancelled, RequestHedger
+from services.scheduler_service import BATCH, GenerationScheduler
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+class FakeUpstream:
+    """Stands in for the model: each request sleeps for the next scripted delay"""
+
+    def __init__(self, delays, scheduler=None):
+        self.delays = list(delays)
+        self.scheduler = scheduler
+        self.sent = 0
+        self._lock = threading.Lock()
+
+    def attempt(self, handle):
+        # Same shape as GeminiService._generate
+        def upstream():
+            if not handle.start():
+                raise AttemptCancelled()
+            with self._lock:
+                self.sent += 1
+                delay = self.delays[min(self.sent, len(self.delays)) - 1]
+            time.sleep(delay)
+            handle.succeeded()
+            return self.sent
+
+        if self.scheduler is None:
+            return upstream()
+        return self.scheduler.run(BATCH, upstream)
+
+
+def test_fast_call_is_not_hedged():
+    hedger = RequestHedger(initial_delay=1.0)
+    upstream = FakeUpstream([0.01])
+    assert hedger.call(upstream.attempt) == 1
+    stats = hedger.stats()
+    assert stats["calls"] == 1
+    assert stats["hedges"] == 0
+    assert upstream.sent == 1
+
+
+def test_slow_primary_is_raced_by_a_hedge():
+    hedger = RequestHedger(initial_delay=0.05)
+    upstream = FakeUpstream([0.5, 0.01])
+    started = time.monotonic()
+    assert hedger.call(upstream.attempt) == 2
+    assert time.monotonic() - started < 0.4
+    stats = hedger.stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+    # The primary is still in flight; its latency is recorded once it lands
+    wait_for(lambda: hedger.stats()["latency_ms"]["primary_only"] is not None)
+    assert hedger.stats()["latency_ms"]["primary_only"]["p50"] >= 400
+
+
+def test_queued_loser_is_stopped_before_reaching_upstream():
+    # With one slot the hedge waits behind the primary it is racing, so the
+    # primary always wins and the hedge must give up without sending
+    scheduler = GenerationScheduler(max_concurrency=1, interactive_reserved=0)
+    hedger = RequestHedger(initial_delay=0.05, min_samples=1)
+    upstream = FakeUpstream([0.2], scheduler=scheduler)
+
+    assert hedger.call(upstream.attempt) == 1
+    wait_for(lambda: hedger.stats()["losers_skipped_upstream"] == 1)
+
+    stats = hedger.stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 0
+    assert upstream.sent == 1
+    # The skipped copy is not a latency sample, so it cannot drag the delay down
+    assert stats["hedge_delay_ms"] >= 150
+    wait_for(lambda: scheduler.stats()["classes"][BATCH]["in_flight"] == 0)
+
+
+def test_hedge_delay_starts_when_the_primary_reaches_upstream():
+    scheduler = GenerationScheduler(max_concurrency=1, interactive_reserved=0)
+    hedger = RequestHedger(initial_delay=0.1)
+    upstream = FakeUpstream([0.01], scheduler=scheduler)
+
+    # Hold the only slot for longer than the hedge delay
+    scheduler.acquire(BATCH)
+    releaser = threading.Timer(0.3, scheduler.release, args=(BATCH,))
+    releaser.start()
+    try:
+        assert hedger.call(upstream.attempt) == 1
+    finally:
+        releaser.join()
+
+    assert hedger.stats()["hedges"] == 0
+    assert upstream.sent == 1
+
+
+def test_hedges_are_limited_by_the_budget():
+    # The initial budget pays for one hedge and nothing is added per call
+    hedger = RequestHedger(initial_delay=0.02, max_extra_fraction=0.0)
+    upstream = FakeUpstream([0.1])
+    for _ in range(3):
+        hedger.call(upstream.attempt)
+
+    stats = hedger.stats()
+    assert stats["calls"] == 3
+    assert stats["hedges"] == 1
+    assert stats["budget_denied"] == 2
+    assert upstream.sent == 4
+
+
+def test_budget_grows_with_max_extra_fraction():
+    hedger = RequestHedger(initial_delay=0.02, max_extra_fraction=0.5)
+    upstream = FakeUpstream([0.1])
+    for _ in range(4):
+        hedger.call(upstream.attempt)
+
+    # 1.0 initial plus 0.5 per call: hedges on calls 1, 2 and 4
+    stats = hedger.stats()
+    assert stats["hedges"] == 3
+    assert stats["budget_denied"] == 1
+
+
+def test_failure_before_start_does_not_hang_the_caller():
+    hedger = RequestHedger(initial_delay=1.0)
+
+    def broken(handle):
+        raise RuntimeError("scheduler refused")
+
+    with pytest.raises(RuntimeError):
+        hedger.call(broken)
@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from services.scheduler_service import BACKGROUND, BATCH, INTERACTIVE, GenerationScheduler
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+def acquire_in_thread(scheduler, priority, granted):
+    def run():
+        scheduler.acquire(priority)
+        granted.append(priority)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def queued(scheduler, priority):
+    return scheduler.stats()["classes"][priority]["queued"]
+
+
+def test_run_returns_result_and_frees_the_slot():
+    scheduler = GenerationScheduler(max_concurrency=1, interactive_reserved=0)
+    assert scheduler.run(BATCH, lambda x: x * 2, 21) == 42
+    stats = scheduler.stats()["classes"][BATCH]
+    assert stats["in_flight"] == 0
+    assert stats["completed"] == 1
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        GenerationScheduler().acquire("urgent")
+
+
+def test_reserved_slots_stay_free_for_interactive():
+    scheduler = GenerationScheduler(max_concurrency=4, interactive_reserved=2)
+    scheduler.acquire(BATCH)
+    scheduler.acquire(BACKGROUND)
+
+    granted = []
+    acquire_in_thread(scheduler, BATCH, granted)
+    wait_for(lambda: queued(scheduler, BATCH) == 1)
+
+    # Bulk work is capped at two slots, but interactive calls still get in
+    scheduler.acquire(INTERACTIVE)
+    scheduler.acquire(INTERACTIVE)
+    assert granted == []
+
+    scheduler.release(BACKGROUND)
+    wait_for(lambda: granted == [BATCH])
+
+
+def test_interactive_may_use_every_slot():
+    scheduler = GenerationScheduler(max_concurrency=3, interactive_reserved=1)
+    for _ in range(3):
+        scheduler.acquire(INTERACTIVE)
+    assert scheduler.stats()["classes"][INTERACTIVE]["in_flight"] == 3
+
+
+def test_reservation_is_capped_below_max_concurrency():
+    scheduler = GenerationScheduler(max_concurrency=2, interactive_reserved=5)
+    assert scheduler.interactive_reserved == 1
+    scheduler.acquire(BATCH)
+
+
+def test_backlogged_classes_share_slots_by_weight():
+    scheduler = GenerationScheduler(max_concurrency=1, interactive_reserved=0,
+                                    weights={BATCH: 3, BACKGROUND: 1})
+    scheduler.acquire(INTERACTIVE)
+
+    granted = []
+    for _ in range(8):
+        acquire_in_thread(scheduler, BATCH, granted)
+        acquire_in_thread(scheduler, BACKGROUND, granted)
+    wait_for(lambda: queued(scheduler, BATCH) == 8 and queued(scheduler, BACKGROUND) == 8)
+
+    # Hand the single slot on one grant at a time
+    scheduler.release(INTERACTIVE)
+    for count in range(1, 8):
+        wait_for(lambda: len(granted) == count)
+        scheduler.release(granted[-1])
+    wait_for(lambda: len(granted) == 8)
+
+    assert granted.count(BATCH) == 6
+    assert granted.count(BACKGROUND) == 2
+
+
+def test_rate_budget_delays_calls_beyond_the_burst():
+    scheduler = GenerationScheduler(max_concurrency=20, requests_per_minute=600, interactive_reserved=0)
+    # One second's worth (10 calls) is admitted at once
+    waits = [scheduler.acquire(BATCH) for _ in range(10)]
+    assert max(waits) < 0.05
+    assert scheduler.acquire(BATCH) >= 0.05
+
+
+@pytest.mark.parametrize("weights", [{BATCH: 0}, {BACKGROUND: -1}, {INTERACTIVE: float("nan")},
+                                     {BATCH: "3"}, {"urgent": 2}])
+def test_invalid_weights_are_rejected(weights):
+    with pytest.raises(ValueError):
+        GenerationScheduler(weights=weights)
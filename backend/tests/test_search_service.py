@@ -0,0 +1,135 @@
+import pytest
+
+from services.search_service import SearchIndex
+
+
+def make_catalog():
+    return [
+        {"id": 1, "title": "Wireless Headphones", "description": "Noise cancelling bluetooth headphones",
+         "category": "electronics"},
+        {"id": 2, "title": "Cotton T-Shirt", "description": "Slim fit cotton shirt for everyday wear",
+         "category": "men's clothing"},
+        {"id": 3, "title": "Gold Ring", "description": "Classic gold ring with a polished finish",
+         "category": "jewelery"},
+        {"id": 4, "title": "Portable Speaker", "description": "Wireless portable speaker with deep bass",
+         "category": "electronics"},
+    ]
+
+
+def hit_ids(index, query, **kwargs):
+    return [hit["id"] for hit in index.search(query, **kwargs)["hits"]]
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.sync_catalog(make_catalog(), version="v1")
+    return index
+
+
+def test_search_ranks_and_facets(index):
+    result = index.search("wireless")
+    assert set(hit_ids(index, "wireless")) == {1, 4}
+    assert result["total"] == 2
+    assert result["facets"]["category"] == {"electronics": 2}
+    assert hit_ids(index, "wireless", category="jewelery") == []
+
+
+def test_prefix_and_typo_matching(index):
+    assert hit_ids(index, "headph") == [1]
+    assert hit_ids(index, "speeker") == [4]
+
+
+def test_sync_same_version_is_a_no_op(index):
+    changed = [dict(p, title="Changed") for p in make_catalog()]
+    assert index.sync_catalog(changed, version="v1") == {"added": 0, "updated": 0, "removed": 0}
+    assert hit_ids(index, "changed") == []
+
+
+def test_sync_updates_only_changed_and_removed_products(index):
+    catalog = make_catalog()
+    catalog[1] = dict(catalog[1], title="Linen T-Shirt", description="Breathable linen shirt")
+    del catalog[2]
+    catalog.append({"id": 5, "title": "Silver Necklace", "description": "Sterling silver chain",
+                    "category": "jewelery"})
+
+    stats = index.sync_catalog(catalog, version="v2")
+
+    assert stats == {"added": 1, "updated": 1, "removed": 1}
+    assert hit_ids(index, "cotton") == []
+    assert hit_ids(index, "linen") == [2]
+    assert hit_ids(index, "gold") == []
+    assert hit_ids(index, "silver") == [5]
+
+
+def test_incremental_updates_match_a_fresh_build(index):
+    index.upsert_product({"id": 3, "title": "Gold Bracelet", "description": "Gold bracelet with clasp",
+                          "category": "jewelery"})
+    index.add_generated_content(4, {"keywords": ["bluetooth", "outdoor"], "features": ["waterproof"]})
+    index.remove_product(2)
+
+    fresh = SearchIndex()
+    catalog = [p for p in make_catalog() if p["id"] != 2]
+    catalog[1] = {"id": 3, "title": "Gold Bracelet", "description": "Gold bracelet with clasp",
+                  "category": "jewelery"}
+    fresh.sync_catalog(catalog)
+    fresh.add_generated_content(4, {"keywords": ["bluetooth", "outdoor"], "features": ["waterproof"]})
+
+    for query in ("bluetooth", "gold bracelet", "waterproof", "cotton", "wireless sp"):
+        assert hit_ids(index, query) == hit_ids(fresh, query), query
+
+
+def test_generated_content_survives_pruning(index):
+    index.add_generated_content(3, {"keywords": ["engagement"]})
+    index.sync_catalog([p for p in make_catalog() if p["id"] != 3], version="v2")
+    assert hit_ids(index, "engagement") == []
+
+    index.sync_catalog(make_catalog(), version="v3")
+    assert hit_ids(index, "engagement") == [3]
+
+
+def test_empty_documents_do_not_break_scoring():
+    index = SearchIndex()
+    index.sync_catalog([{"id": 1, "title": "", "description": ""}])
+    assert index.search("anything")["hits"] == []
+
+
+def test_save_load_round_trip(index, tmp_path):
+    index.add_generated_content(1, {"keywords": ["travel"], "features": ["foldable"]})
+    path = tmp_path / "index.pkl"
+    assert index.save(str(path))
+
+    loaded = SearchIndex(str(path))
+
+    assert loaded.stats() == index.stats()
+    for query in ("wireless", "travel", "cotton shirt", "gol", "portable"):
+        assert loaded.search(query)["hits"] == index.search(query)["hits"], query
+    # The saved catalog version still short-circuits an unchanged sync
+    assert loaded.sync_catalog(make_catalog(), version="v1") == {"added": 0, "updated": 0, "removed": 0}
+
+
+def test_load_ignores_a_corrupt_file(tmp_path):
+    path = tmp_path / "index.pkl"
+    path.write_bytes(b"not a pickle")
+    index = SearchIndex(str(path))
+    assert index.stats()["documents"] == 0
+
+
+def test_negative_limit_and_offset_return_no_extra_hits(index):
+    assert index.search("wireless", limit=-1)["hits"] == []
+    assert hit_ids(index, "wireless", limit=1, offset=-5) == hit_ids(index, "wireless", limit=1)
+    assert index.search("wireless", limit=-1)["total"] == 2
+
+
+def test_save_if_dirty_writes_in_the_background(index, tmp_path):
+    index.index_path = str(tmp_path / "index.pkl")
+    assert index.save_if_dirty()
+    index.wait_for_save()
+    assert not index.save_if_dirty()
+
+    index.add_generated_content(2, {"keywords": ["organic"]})
+    assert not index.save_if_dirty(min_interval=3600)
+    assert index.save_if_dirty()
+    index.wait_for_save()
+
+    assert hit_ids(SearchIndex(index.index_path), "organic") == [2]
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from services.seo_service import SEOAuditor
+
+WORDS = ("premium quality durable lightweight classic modern slim fit cotton wireless portable "
+         "stainless steel gold silver casual everyday travel laptop bag").split()
+
+
+def description(seed, length=180):
+    rng = random.Random(seed)
+    words = rng.choices(WORDS + [f"term{i}" for i in range(200)], k=length)
+    return " ".join(word + ("." if i % 12 == 11 else "") for i, word in enumerate(words))
+
+
+def audit(items, **kwargs):
+    results = list(SEOAuditor(**kwargs).audit(items))
+    return results[:-1], results[-1]["summary"]
+
+
+def metrics(item):
+    return audit([item])[0][0]["metrics"]
+
+
+def test_keywords_match_whole_tokens_and_phrases():
+    m = metrics({"description": "Slim-fit cotton shirt. Golden buttons, slim fit cut.",
+                 "keywords": ["slim fit", "gold", "Cotton"]})
+    assert m["word_count"] == 9
+    assert m["keyword_count"] == 3
+    # "slim fit" twice (2 words each) and "cotton" once; "gold" does not match "golden"
+    assert m["keyword_density"] == round(5 / 9, 4)
+    assert m["keyword_coverage"] == round(2 / 3, 3)
+
+
+def test_string_keywords_are_split_on_commas():
+    as_string = metrics({"description": "A slim fit cotton shirt", "keywords": "slim fit, cotton"})
+    as_list = metrics({"description": "A slim fit cotton shirt", "keywords": ["slim fit", "cotton"]})
+    assert as_string == as_list
+    assert as_string["keyword_count"] == 2
+    assert as_string["keyword_density"] == 0.6
+
+
+@pytest.mark.parametrize("keywords, expected", [(None, 0), ([], 0), (["", "  ", "x"], 1), (7, 1)])
+def test_blank_and_odd_keyword_values(keywords, expected):
+    assert metrics({"description": "some text", "keywords": keywords})["keyword_count"] == expected
+
+
+def test_empty_description():
+    m = metrics({"description": "", "keywords": ["bag"]})
+    assert m["word_count"] == 0
+    assert m["keyword_density"] == 0.0
+    assert m["readability"] == 0.0
+
+
+def test_duplicates_are_detected_across_batches():
+    items = [{"product_id": i, "description": description(i)} for i in range(6)]
+    items.append({"product_id": "copy", "description": description(1)})
+    items.append({"product_id": "near", "description": description(2) + " extra words"})
+
+    results, summary = audit(items, batch_size=3)
+
+    by_id = {r["product_id"]: r for r in results}
+    assert by_id["copy"]["metrics"]["duplicate_of"] == 1
+    assert by_id["copy"]["metrics"]["duplicate_similarity"] == 1.0
+    assert by_id["near"]["metrics"]["duplicate_of"] == 2
+    assert "duplicate_content" in by_id["near"]["issues"]
+    assert summary["issues"]["duplicate_content"] == 2
+    assert summary["audited"] == 8
+
+
+def test_batch_size_does_not_change_results():
+    items = [{"product_id": i, "seo_title": f"Title {i} " * 4, "description": description(i % 4 + i // 4),
+              "keywords": ["slim fit", "cotton", WORDS[i % len(WORDS)]]} for i in range(20)]
+    assert audit(items, batch_size=3) == audit(items, batch_size=1000)
+
+
+def test_rank_variants_prefers_the_in_band_variant():
+    variants = [{"description": "too short"}, {"description": description(3, 200)}]
+    ranked = SEOAuditor().rank_variants(variants, focus_keywords=["cotton"], target_words=(150, 300))
+    assert ranked[0]["description"] == variants[1]["description"]
@@ -0,0 +1,134 @@
+import time
+
+import pytest
+
+from services.work_queue import DONE, FAILED, PENDING, WorkQueue, product_key, record_key
+
+LEASE_SECONDS = 0.05
+
+
+def products(n, start=1):
+    return [{"id": i, "title": f"Product {i}"} for i in range(start, start + n)]
+
+
+def result(product):
+    return {"id": product.get("id"), "key": None if product.get("id") is not None else product_key(product),
+            "description": f"About {product['title']}"}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return WorkQueue(str(tmp_path / "work.db"), lease_seconds=LEASE_SECONDS, max_attempts=3)
+
+
+def expire():
+    time.sleep(LEASE_SECONDS * 2)
+
+
+def test_enqueue_batches_and_skips_known_products(queue):
+    assert queue.enqueue(products(5), batch_size=2) == 5
+    assert queue.enqueue(products(6), batch_size=2) == 1
+    assert queue.stats()["batches"][PENDING] == 4
+    assert queue.remaining() == 4
+
+
+def test_leases_are_exclusive_until_they_expire(queue):
+    queue.enqueue(products(2), batch_size=2)
+    first = queue.lease("worker-a")
+    assert [p["id"] for p in first.products] == [1, 2]
+    assert queue.lease("worker-b") is None
+
+    expire()
+    second = queue.lease("worker-b")
+
+    assert second.batch_id == first.batch_id
+    assert second.attempt == 2
+    assert queue.stats()["reissued_leases"] == 1
+    # The first worker lost the batch and can no longer renew or close it
+    assert not queue.heartbeat(first)
+    assert queue.complete(first) is None
+
+
+def test_heartbeat_keeps_a_lease_alive(queue):
+    queue.enqueue(products(1))
+    lease = queue.lease("worker-a")
+    for _ in range(3):
+        time.sleep(LEASE_SECONDS / 2)
+        assert queue.heartbeat(lease)
+    assert queue.lease("worker-b") is None
+
+
+def test_reissued_batch_only_hands_out_unfinished_products(queue):
+    queue.enqueue(products(3), batch_size=3)
+    first = queue.lease("worker-a")
+    queue.save_results(first, [result(first.products[0])])
+
+    expire()
+    second = queue.lease("worker-b")
+
+    assert [p["id"] for p in second.products] == [2, 3]
+
+
+def test_results_are_first_write_wins(queue):
+    queue.enqueue(products(2), batch_size=2)
+    first = queue.lease("worker-a")
+    expire()
+    second = queue.lease("worker-b")
+
+    assert queue.save_results(second, [dict(result(p), worker="b") for p in second.products]) == 2
+    # The late worker's results are ignored, not duplicated
+    assert queue.save_results(first, [dict(result(p), worker="a") for p in first.products]) == 0
+
+    records = list(queue.iter_results())
+    assert [r["id"] for r in records] == [1, 2]
+    assert {r["worker"] for r in records} == {"b"}
+    assert queue.complete(second) == DONE
+    assert queue.remaining() == 0
+
+
+def test_incomplete_batch_is_retried_then_failed(queue):
+    queue.enqueue(products(1))
+    for attempt in range(1, 4):
+        lease = queue.lease("worker-a")
+        assert lease.attempt == attempt
+        state = queue.complete(lease, {1: "upstream error"})
+    assert state == FAILED
+    assert queue.lease("worker-a") is None
+    assert queue.stats()["failed_batches"] == [{"batch_id": 1, "error": "1: upstream error"}]
+
+    assert queue.retry_failed() == 1
+    assert queue.lease("worker-a").attempt == 1
+
+
+def test_abandoned_lease_fails_after_max_attempts(queue):
+    queue.enqueue(products(1))
+    for _ in range(3):
+        assert queue.lease("worker-a") is not None
+        expire()
+    assert queue.lease("worker-a") is None
+    assert queue.stats()["batches"][FAILED] == 1
+
+
+def test_release_does_not_count_as_an_attempt(queue):
+    queue.enqueue(products(1))
+    queue.release(queue.lease("worker-a"))
+    assert queue.lease("worker-b").attempt == 1
+
+
+def test_products_without_an_id_get_distinct_keys(queue):
+    items = [{"title": "No id A"}, {"title": "No id B"}, {"id": 7, "title": "Seven"}]
+    assert queue.enqueue(items) == 3
+    assert queue.enqueue(items) == 0
+
+    lease = queue.lease("worker-a")
+    assert queue.save_results(lease, [result(p) for p in lease.products]) == 3
+    assert queue.complete(lease) == DONE
+    assert [r["description"] for r in queue.iter_results()] == [
+        "About No id A", "About No id B", "About Seven"]
+
+
+def test_keys_are_stable():
+    assert product_key({"id": 1}) == record_key({"id": 1}) == "1"
+    assert product_key({"id": "1"}) != product_key({"id": 1})
+    assert product_key({"title": "a", "price": 1}) == product_key({"price": 1, "title": "a"})
+    assert record_key({"id": None, "key": product_key({"title": "a"})}) == product_key({"title": "a"})
@@ -2,10 +2,65 @@ import requests
 from PIL import Image
 import io
 import base64
+import hashlib
+import json
 import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
+# Gemini bills an image that fits in 384x384 as one 258-token unit and
+# larger images as 258 tokens per 768x768 tile
+IMAGE_TOKENS_PER_TILE = 258
+SMALL_IMAGE_SIDE = 384
+IMAGE_TILE_SIDE = 768
+
+class ImageCache:
+    """Thread-safe LRU cache keyed by content hash, optionally mirrored to disk"""
+    
+    def __init__(self, max_entries=512, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+    
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, key)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    value = f.read()
+                self._remember(key, value)
+                return value
+        return None
+    
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, key)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+    
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
 class ImageProcessor:
     """Utility class for processing product images"""
     
@@ -85,4 +140,144 @@ class ImageProcessor:
             return None
         except Exception as e:
             logger.error(f"Error getting image info: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+    
+    @staticmethod
+    def fit_pixel_budget(image, max_pixels, max_side=None):
+        """
+        Downscale an image so that width * height stays within a pixel budget
+        
+        Args:
+            image (PIL.Image): Image to resize
+            max_pixels (int): Maximum number of pixels
+            max_side (int): Optional cap on the longer side
+            
+        Returns:
+            PIL.Image: The original image if it fits, otherwise a resized copy
+        """
+        width, height = image.size
+        scale = min(1.0, math.sqrt(max_pixels / float(width * height)))
+        if max_side:
+            scale = min(scale, max_side / float(max(width, height)))
+        if scale >= 1.0:
+            return image
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        return image.resize(size, Image.Resampling.LANCZOS)
+    
+    @staticmethod
+    def estimate_image_tokens(size):
+        """
+        Estimate the prompt tokens Gemini charges for an image of the given size
+        
+        Args:
+            size (tuple): (width, height) in pixels
+            
+        Returns:
+            int: Estimated token count
+        """
+        width, height = size
+        if width <= SMALL_IMAGE_SIDE and height <= SMALL_IMAGE_SIDE:
+            return IMAGE_TOKENS_PER_TILE
+        tiles = math.ceil(width / IMAGE_TILE_SIDE) * math.ceil(height / IMAGE_TILE_SIDE)
+        return tiles * IMAGE_TOKENS_PER_TILE
+    
+    @staticmethod
+    def _url_entry(raw):
+        """Decode a cached URL record; entries in an older format count as missing"""
+        if not raw:
+            return {}
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            return {}
+        return entry if isinstance(entry, dict) else {}
+    
+    @staticmethod
+    def encode_for_model(image_url, cache, max_pixels=768 * 768, quality=80, image_format='JPEG',
+                         max_side=IMAGE_TILE_SIDE, url_ttl=3600):
+        """
+        Download, downscale and re-encode a product image for the model, with caching
+        
+        The source bytes are addressed by their SHA-256 and the encoded result
+        by that hash plus the encoding settings, so an image is encoded once
+        per content and settings. The URL-to-hash mapping is trusted for
+        url_ttl seconds; after that the URL is revalidated with its ETag or
+        Last-Modified (a 304 keeps the cached image), or downloaded again if
+        the server sends neither, so a changed image is picked up.
+        
+        Args:
+            image_url (str): URL of the product image
+            cache (ImageCache): Cache for URL lookups and encoded images
+            max_pixels (int): Pixel budget for the encoded image
+            max_side (int): Cap on the longer side; the default keeps images to one token tile
+            url_ttl (float): Seconds before a cached URL is revalidated
+            quality (int): JPEG/WebP quality
+            image_format (str): 'JPEG' or 'WEBP'
+            
+        Returns:
+            dict or None: data, mime_type, content_hash, size, bytes,
+            estimated_tokens and cache_hit; None if the image is unavailable
+        """
+        try:
+            image_format = image_format.upper()
+            url_key = 'url-' + hashlib.sha256(image_url.encode('utf-8')).hexdigest()
+            entry = ImageProcessor._url_entry(cache.get(url_key))
+            content_hash = entry.get("hash")
+            
+            source = None
+            if content_hash is None or time.time() - entry.get("checked_at", 0) >= url_ttl:
+                headers = {}
+                if content_hash and entry.get("etag"):
+                    headers['If-None-Match'] = entry["etag"]
+                if content_hash and entry.get("last_modified"):
+                    headers['If-Modified-Since'] = entry["last_modified"]
+                response = requests.get(image_url, headers=headers, timeout=10)
+                if response.status_code != 304:
+                    response.raise_for_status()
+                    source = response.content
+                    content_hash = hashlib.sha256(source).hexdigest()
+                entry = {
+                    "hash": content_hash,
+                    "etag": response.headers.get('ETag') or entry.get("etag"),
+                    "last_modified": response.headers.get('Last-Modified') or entry.get("last_modified"),
+                    "checked_at": time.time(),
+                }
+                cache.put(url_key, json.dumps(entry).encode('utf-8'))
+            
+            settings = f"{max_pixels}-{max_side}-{quality}-{image_format}"
+            encoded_key = f"img-{content_hash}-{hashlib.sha1(settings.encode('ascii')).hexdigest()[:12]}"
+            encoded = cache.get(encoded_key)
+            cache_hit = encoded is not None
+            
+            if encoded is None:
+                if source is None:
+                    response = requests.get(image_url, timeout=10)
+                    response.raise_for_status()
+                    source = response.content
+                
+                image = Image.open(io.BytesIO(source))
+                if image.mode not in ('RGB', 'L'):
+                    image = image.convert('RGB')
+                image = ImageProcessor.fit_pixel_budget(image, max_pixels, max_side)
+                
+                buffer = io.BytesIO()
+                image.save(buffer, format=image_format, quality=quality, optimize=True)
+                encoded = buffer.getvalue()
+                cache.put(encoded_key, encoded)
+            
+            size = Image.open(io.BytesIO(encoded)).size
+            return {
+                "data": encoded,
+                "mime_type": f"image/{image_format.lower()}",
+                "content_hash": content_hash,
+                "size": size,
+                "bytes": len(encoded),
+                "source_bytes": len(source) if source is not None else None,
+                "estimated_tokens": ImageProcessor.estimate_image_tokens(size),
+                "cache_hit": cache_hit,
+            }
+        
+        except Exception as e:
+            logger.error(f"Error encoding image from {image_url}: {str(e)}")
+            return None
+